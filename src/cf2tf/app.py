@@ -1,11 +1,13 @@
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 import click
 import click_log
 
+import cf2tf.batch as batch
 import cf2tf.save
+import cf2tf.terraform.match_cache as match_cache
 from cf2tf.cloudformation import Template
 from cf2tf.convert import TemplateConverter
 from cf2tf.terraform import code
@@ -14,20 +16,79 @@ log = logging.getLogger("cf2tf")
 click_log.basic_config(log)
 
 
+def prune_cache(ctx: click.Context, _param: click.Parameter, value: bool):
+    """Removes old fuzzy matches from the match cache and exits."""
+
+    if not value or ctx.resilient_parsing:
+        return
+
+    removed = match_cache.prune_cache()
+
+    if removed is None:
+        click.echo("// The match cache is not available.")
+    else:
+        click.echo(f"// Removed {removed} cached matches.")
+
+    ctx.exit()
+
+
 @click.command()  # type: ignore
 @click.version_option()
+@click.option(
+    "--prune-cache",
+    is_flag=True,
+    expose_value=False,
+    is_eager=True,
+    callback=prune_cache,
+    help="Remove old fuzzy matches from the match cache and exit.",
+)
 @click.option("--output", "-o", type=click.Path(exists=False))
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes used to convert the resources, or the templates of a batch.",
+)
+@click.option(
+    "--threads",
+    is_flag=True,
+    help=(
+        "Use threads instead of processes for --jobs, needs a free-threaded Python."
+        " Only for a single template."
+    ),
+)
+@click.option(
+    "--lazy",
+    is_flag=True,
+    help="Only convert the Mappings and Conditions that are used.",
+)
 @click_log.simple_verbosity_option(log)
-@click.argument("template_path", type=click.Path(exists=True))
-def cli(output: Optional[str], template_path: str):
+@click.argument("template_paths", nargs=-1, required=True, type=click.Path(exists=True))
+def cli(
+    output: Optional[str],
+    jobs: int,
+    threads: bool,
+    lazy: bool,
+    template_paths: Tuple[str, ...],
+):
     """Convert Cloudformation template into Terraform.
 
     Args:
-        template_path (str): The path to the cloudformation template
+        template_paths (Tuple[str, ...]): The paths to the cloudformation templates
     """
 
+    # A batch of templates is converted by workers that share one warm process
+    if len(template_paths) > 1:
+        if threads:
+            raise click.UsageError("--threads can only be used with a single template.")
+
+        batch.convert_batch([Path(path) for path in template_paths], output, jobs, lazy)
+        return
+
     # Need to take this path and parse the cloudformation file
-    tmpl_path = Path(template_path)
+    tmpl_path = Path(template_paths[0])
 
     # Where/how we will write the results
     output_writer = cf2tf.save.create_writer(output)
@@ -41,7 +102,9 @@ def cli(output: Optional[str], template_path: str):
     search_manger = code.search_manager()
 
     # Turn Cloudformation template into a Terraform configuration
-    config = TemplateConverter(tmpl_path.stem, cf_template, search_manger).convert()
+    config = TemplateConverter(
+        tmpl_path.stem, cf_template, search_manger, jobs, threads, lazy
+    ).convert()
 
     # Save this configuration to disc
     config.save(output_writer)
@@ -0,0 +1,115 @@
+"""Converts a batch of templates using one warm process.
+
+Every conversion has to open the provider checkout, load the doc index and open
+the match cache. For a batch of templates that is done once, then the worker
+processes are forked from the warm process. The workers inherit the loaded
+modules, the search manager and the doc index copy-on-write, so the startup
+cost is paid once per batch instead of once per template.
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Optional
+
+import cf2tf.parallel as parallel
+import cf2tf.save
+from cf2tf.cloudformation import Template
+from cf2tf.convert import TemplateConverter
+from cf2tf.terraform import code
+from cf2tf.terraform.blocks import Block
+
+if TYPE_CHECKING:
+    from cf2tf.terraform.code import SearchManager
+
+log = logging.getLogger("cf2tf")
+
+# The warm search manager and options, inherited by the forked workers
+_search_manager: Optional["SearchManager"] = None
+_lazy = False
+
+
+def convert_batch(
+    template_paths: List[Path], output: Optional[str], jobs: int = 1, lazy=False
+):
+    """Converts many templates and saves each of them.
+
+    Args:
+        template_paths (List[Path]): The Cloudformation templates to convert.
+        output (Optional[str]): A directory that gets a folder for each template,
+            or None to write everything to stdout.
+        jobs (int, optional): The number of worker processes. Defaults to 1.
+        lazy (bool, optional): Only convert the Mappings and Conditions that are used.
+
+    Raises:
+        ValueError: If two templates would be saved to the same folder.
+    """
+
+    global _search_manager, _lazy
+
+    stems = [path.stem for path in template_paths]
+
+    if output and len(set(stems)) != len(stems):
+        raise ValueError("Templates in a batch must have different file names.")
+
+    _search_manager = code.search_manager()
+    _lazy = lazy
+
+    try:
+        results: Iterable[List[Block]]
+
+        if jobs > 1 and len(template_paths) > 1 and parallel.available():
+            with ProcessPoolExecutor(
+                max_workers=jobs,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=parallel.init_worker,
+            ) as executor:
+                results = executor.map(_convert_in_worker, template_paths)
+
+                # Results are saved in the same order as the templates
+                for template_path, resources in zip(template_paths, results):
+                    save(template_path, resources, output)
+        else:
+            for template_path in template_paths:
+                save(template_path, convert_template(template_path), output)
+    finally:
+        _search_manager = None
+
+
+def convert_template(template_path: Path) -> List[Block]:
+    """Converts a single template with the warm search manager.
+
+    Args:
+        template_path (Path): The Cloudformation template.
+
+    Returns:
+        List[Block]: The Terraform blocks of the template.
+    """
+
+    if _search_manager is None:
+        raise RuntimeError("Templates can only be converted by convert_batch.")
+
+    log.info(f"// Converting {template_path.name} to Terraform!")
+
+    cf_template = Template.from_yaml(template_path).template
+
+    config = TemplateConverter(
+        template_path.stem, cf_template, _search_manager, lazy=_lazy
+    )
+
+    return config.convert().resources
+
+
+def save(template_path: Path, resources: List[Block], output: Optional[str]):
+    output_dir = str(Path(output).joinpath(template_path.stem)) if output else None
+
+    cf2tf.save.create_writer(output_dir).save(resources)
+
+
+def _convert_in_worker(template_path: Path) -> List[Block]:
+    resources = convert_template(template_path)
+
+    parallel.flush_worker()
+
+    return resources
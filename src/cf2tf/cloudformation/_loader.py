@@ -0,0 +1,95 @@
+"""Loads a Cloudformation template in a single pass.
+
+The short form functions like `!Ref`, `!Sub` and `!GetAtt` are constructed in
+their long form, like `{"Ref": "Bucket"}`, while the YAML is parsed. libyaml is
+used when it's available.
+
+Templates used to be loaded with `cfn_tools`, dumped back to YAML and loaded
+again to get plain dicts. The result is the same, including the key order and
+the type of every value.
+"""
+
+from typing import Any, Dict, List
+
+import yaml  # type: ignore
+
+try:
+    from yaml import CSafeLoader as _SafeLoader  # type: ignore
+except ImportError:
+    # PyYAML built without libyaml is slower but loads the same values
+    from yaml import SafeLoader as _SafeLoader  # type: ignore
+
+# The functions that don't start with Fn::
+UNPREFIXED = ("Ref", "Condition")
+
+
+class TemplateLoader(_SafeLoader):
+    """A safe YAML loader that knows the Cloudformation short form functions."""
+
+
+def load(source: str) -> Any:
+    """Loads a Cloudformation template from YAML or JSON.
+
+    Args:
+        source (str): The contents of the template file.
+
+    Returns:
+        Any: The template, as plain dicts and lists.
+    """
+
+    return yaml.load(source, Loader=TemplateLoader)
+
+
+def construct_function(loader: TemplateLoader, tag_suffix: str, node: Any) -> Dict:
+    """Constructs a short form function, like `!Ref Bucket`, in its long form.
+
+    Args:
+        loader (TemplateLoader): The loader of the template.
+        tag_suffix (str): The name of the function, without the `!`.
+        node (Any): The YAML node of the function's argument.
+
+    Raises:
+        ValueError: If the node is not a scalar, sequence or mapping.
+
+    Returns:
+        Dict: The function as a map of its name to its argument.
+    """
+
+    name = tag_suffix if tag_suffix in UNPREFIXED else f"Fn::{tag_suffix}"
+
+    value: Any
+
+    if name == "Fn::GetAtt":
+        value = _construct_get_att(node)
+    elif isinstance(node, yaml.ScalarNode):
+        # The argument is always a string, `!Ref 123` is a Ref to "123"
+        value = loader.construct_scalar(node)
+    elif isinstance(node, yaml.SequenceNode):
+        value = loader.construct_sequence(node)
+    elif isinstance(node, yaml.MappingNode):
+        value = _sorted(loader.construct_mapping(node))
+    else:
+        raise ValueError(f"Bad tag: !{name}")
+
+    return {name: value}
+
+
+def _construct_get_att(node: Any) -> List:
+    if isinstance(node.value, str):
+        return node.value.split(".", 1)
+
+    if isinstance(node.value, list):
+        return [item.value for item in node.value]
+
+    raise ValueError(f"Unexpected node type: {type(node.value)}")
+
+
+def _sorted(mapping: Dict) -> Dict:
+    # The round trip through YAML sorted the keys of the maps passed to functions
+    try:
+        return dict(sorted(mapping.items()))
+    except TypeError:
+        return mapping
+
+
+TemplateLoader.add_multi_constructor("!", construct_function)
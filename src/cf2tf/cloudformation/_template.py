@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import logging
+from functools import cached_property
 from pathlib import Path
 from typing import Any, Dict, Optional, Union
 
 import yaml  # type: ignore
-from cfn_tools import dump_yaml, load_yaml  # type: ignore
+
+from cf2tf.cloudformation._loader import load
 
 log = logging.getLogger("cf2tf")
 
@@ -51,7 +53,6 @@ class Template:
         if not isinstance(imports, dict):
             raise TypeError(f"Imports should be a dict, not {type(imports).__name__}.")
 
-        self.raw: str = yaml.dump(template)
         self.template = template
         self.Region = Template.Region
         self.imports = imports
@@ -74,10 +75,12 @@ class Template:
         with open(template_path) as f:
             raw = f.read()
 
-        tmp_yaml = load_yaml(raw)
+        template = load(raw)
 
-        tmp_str = dump_yaml(tmp_yaml)
+        return cls(template, imports)
 
-        template = yaml.load(tmp_str, Loader=yaml.FullLoader)
+    @cached_property
+    def raw(self) -> str:
+        """The template dumped as YAML, only made when it's needed."""
 
-        return cls(template, imports)
+        return yaml.dump(self.template)
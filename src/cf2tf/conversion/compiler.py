@@ -0,0 +1,1015 @@
+"""Compiles Cloudformation values into a tree of typed nodes.
+
+A value from the template is compiled once into nodes for its maps, lists,
+scalars and intrinsic functions. Each function has its own node, which keeps the
+literal parts of its argument, like the delimiter of Fn::Join or the condition of
+Fn::If, and has the values of its argument as children. The nesting of the
+functions and the shape of their arguments are checked while compiling, against
+`ALLOWED_FUNCTIONS`, before anything is converted.
+
+The nodes are then lowered to Terraform types in a separate pass. A function is
+lowered from the Terraform values of its children, with the expression builders
+in `expressions`.
+
+Frozen subtrees that repeat, like the same Tags on many resources, are compiled
+once and their nodes are shared. Each shared node is also lowered once and the
+Terraform value is reused, until the post process blocks change.
+
+Neither pass is recursive, so deeply nested values can't hit the recursion limit.
+"""
+
+import datetime
+import logging
+from abc import ABC, abstractmethod
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+
+import cf2tf.conversion.expressions as functions
+from cf2tf.conversion.ir import FROZEN
+from cf2tf.terraform.hcl2.complex import ListType, MapType
+from cf2tf.terraform.hcl2.custom import CommentType
+from cf2tf.terraform.hcl2.primitive import (
+    BooleanType,
+    NumberType,
+    StringType,
+    TerraformType,
+)
+
+if TYPE_CHECKING:
+    from cf2tf.convert import TemplateConverter
+
+log = logging.getLogger("cf2tf")
+
+
+class Node(ABC):
+    """A compiled Cloudformation value."""
+
+    __slots__ = ()
+
+    children: Tuple["Node", ...] = ()
+
+    # Identifies a node compiled from a frozen subtree, so it can be shared
+    key: Optional[Hashable] = None
+
+    @abstractmethod
+    def lower(self, template: "TemplateConverter", children: List[Any]) -> Any:
+        """Converts the node to its Terraform equivalent.
+
+        Args:
+            template (TemplateConverter): The template being converted.
+            children (List[Any]): The lowered children of this node.
+
+        Returns:
+            Any: The Terraform value.
+        """
+
+
+class Scalar(Node):
+    """A string, number, boolean or date."""
+
+    __slots__ = ("make", "value")
+
+    def __init__(self, value: Any) -> None:
+        # Unknown types are found while compiling, not converting
+        self.make = scalar_type(value)
+        self.value = value
+
+    def lower(self, template: "TemplateConverter", children: List[Any]):
+        # Equal strings are lowered to the same shared StringType
+        return self.make(self.value)
+
+
+class Raw(Node):
+    """A value that is kept as it is, like the Condition of a resource."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def lower(self, template: "TemplateConverter", children: List[Any]):
+        return self.value
+
+
+class Map(Node):
+    """A map of names to values."""
+
+    __slots__ = ("names", "children", "key")
+
+    def __init__(
+        self,
+        names: Tuple[str, ...],
+        children: Tuple[Node, ...],
+        key: Optional[Hashable] = None,
+    ) -> None:
+        self.names = names
+        self.children = children
+        self.key = key
+
+    def lower(self, template: "TemplateConverter", children: List[Any]):
+        return MapType(dict(zip(self.names, children)))
+
+
+class Sequence(Node):
+    """A list of values."""
+
+    __slots__ = ("children", "key")
+
+    def __init__(
+        self, children: Tuple[Node, ...], key: Optional[Hashable] = None
+    ) -> None:
+        self.children = children
+        self.key = key
+
+    def lower(self, template: "TemplateConverter", children: List[Any]):
+        return ListType(children)
+
+
+class Ref(Node):
+    """The Ref function, which is allowed anywhere."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: Any) -> None:
+        self.name = name
+
+    def lower(self, template: "TemplateConverter", children: List[Any]):
+        return functions.ref(template, self.name)
+
+
+class Condition(Node):
+    """The Condition function, which names a condition of the template."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def lower(self, template: "TemplateConverter", children: List[Any]):
+        return functions.condition(template, self.name)
+
+
+class Function(Node):
+    """An intrinsic function, like Fn::Join or Fn::If.
+
+    The literal parts of the argument, like the delimiter of Fn::Join, are kept on
+    the node and the values in the argument are its children. The function is
+    lowered to a comment when it can't be converted.
+    """
+
+    __slots__ = ("children", "key")
+
+    # The name of the function in the template
+    name = ""
+
+    # The number of values in the argument, or None if the argument is one value
+    sizes: Optional[range] = None
+
+    # Why the number of values is wrong
+    detail = ""
+
+    def __init__(
+        self, children: Tuple[Node, ...], key: Optional[Hashable] = None
+    ) -> None:
+        self.children = children
+        self.key = key
+
+    @classmethod
+    def parse(cls, argument: Any) -> Tuple["Make", List[Any]]:
+        """Splits the argument of the function into its literal parts and values.
+
+        Args:
+            argument (Any): The argument of the function in the template.
+
+        Raises:
+            TypeError: If the argument or its literal parts are the wrong type.
+            ValueError: If the argument has the wrong number of values.
+
+        Returns:
+            Tuple[Make, List[Any]]: Makes the node from its compiled children, and
+            the values to compile as its children.
+        """
+
+        if cls.sizes is None:
+            return cls, [argument]
+
+        return cls, _values(cls, argument)
+
+    def lower(self, template: "TemplateConverter", children: List[Any]):
+        try:
+            return self.convert(template, children)
+        except Exception as e:
+            return _unresolved(self.name, self.argument(children), e)
+
+    @abstractmethod
+    def convert(
+        self, template: "TemplateConverter", children: List[Any]
+    ) -> TerraformType:
+        """Converts the function to its Terraform equivalent.
+
+        Args:
+            template (TemplateConverter): The template being converted.
+            children (List[Any]): The lowered values of the argument.
+
+        Returns:
+            TerraformType: Terraform equivalent expression.
+        """
+
+    def argument(self, children: List[Any]) -> Any:
+        """Puts the lowered argument back together, for the comment when the
+        function can't be converted.
+
+        Args:
+            children (List[Any]): The lowered values of the argument.
+
+        Returns:
+            Any: The lowered argument.
+        """
+
+        if self.sizes is None:
+            return children[0]
+
+        return ListType(children)
+
+
+class And(Function):
+    """Fn::And, true when all of its conditions are true."""
+
+    __slots__ = ()
+
+    name = "Fn::And"
+    sizes = range(2, 11)
+    detail = "The values must have between 2 and 10 conditions."
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        return functions.and_expression(ListType(children))
+
+
+class Equals(Function):
+    """Fn::Equals, which compares two values."""
+
+    __slots__ = ()
+
+    name = "Fn::Equals"
+    sizes = range(2, 3)
+    detail = "The values must contain two values to compare."
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        left, right = children
+
+        return functions.equals_expression(left, right)
+
+
+class If(Function):
+    """Fn::If, which picks a value with a condition of the template."""
+
+    __slots__ = ("condition",)
+
+    name = "Fn::If"
+    sizes = range(3, 4)
+    detail = (
+        "The values must contain the name of a condition, "
+        "a True value and a False value."
+    )
+
+    def __init__(
+        self, condition: str, children: Tuple[Node, ...], key: Optional[Hashable] = None
+    ) -> None:
+        super().__init__(children, key)
+        self.condition = condition
+
+    @classmethod
+    def parse(cls, argument: Any):
+        condition, true_value, false_value = _values(cls, argument)
+
+        if not isinstance(condition, str):
+            raise TypeError(
+                f"Fn::If - The Condition should be a String, not {type(condition).__name__}."
+            )
+
+        return partial(cls, condition), [true_value, false_value]
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        true_value, false_value = children
+
+        return functions.if_expression(self.condition, true_value, false_value)
+
+    def argument(self, children: List[Any]):
+        return ListType([StringType(self.condition), *children])
+
+
+class Not(Function):
+    """Fn::Not, which negates a condition."""
+
+    __slots__ = ()
+
+    name = "Fn::Not"
+    sizes = range(1, 2)
+    detail = "The values must contain a single Condition."
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        (condition,) = children
+
+        return functions.not_expression(condition)
+
+
+class Or(Function):
+    """Fn::Or, true when any of its conditions is true."""
+
+    __slots__ = ()
+
+    name = "Fn::Or"
+    sizes = range(2, 11)
+    detail = "The values must have between 2 and 10 conditions."
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        return functions.or_expression(children)
+
+
+class Base64(Function):
+    """Fn::Base64, which encodes a string."""
+
+    __slots__ = ()
+
+    name = "Fn::Base64"
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        (value,) = children
+
+        return functions.base64_expression(value)
+
+
+class Cidr(Function):
+    """Fn::Cidr, which splits a CIDR block into subnets."""
+
+    __slots__ = ()
+
+    name = "Fn::Cidr"
+    sizes = range(3, 4)
+    detail = "The value must contain a ipBlock, the count of subnets and the cidrBits."
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        ip_block, count, host_bits = children
+
+        # The CIDR block itself, not the quoted Terraform string
+        return functions.cidr_expression(ip_block.value, int(count), int(host_bits))
+
+
+class FindInMap(Function):
+    """Fn::FindInMap, which looks up a value in the Mappings."""
+
+    __slots__ = ()
+
+    name = "Fn::FindInMap"
+    sizes = range(3, 4)
+    detail = "The values must contain a MapName, TopLevelKey and SecondLevelKey."
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        map_name, top_key, second_key = children
+
+        return functions.find_in_map_expression(template, map_name, top_key, second_key)
+
+
+class GetAtt(Function):
+    """Fn::GetAtt, an attribute of a resource."""
+
+    __slots__ = ("logical_id", "attribute")
+
+    name = "Fn::GetAtt"
+
+    def __init__(
+        self,
+        logical_id: str,
+        attribute: str,
+        children: Tuple[Node, ...],
+        key: Optional[Hashable] = None,
+    ) -> None:
+        super().__init__(children, key)
+        self.logical_id = logical_id
+        self.attribute = attribute
+
+    @classmethod
+    def parse(cls, argument: Any):
+        if isinstance(argument, str):
+            if "." not in argument:
+                raise ValueError(
+                    "Fn::GetAtt - The value must contain a resource id and an attribute."
+                )
+
+            argument = argument.split(".", 1)
+
+        if not isinstance(argument, list):
+            raise TypeError(
+                f"Fn::GetAtt - The value must be a String or List, not {type(argument).__name__}."
+            )
+
+        if len(argument) != 2:
+            raise ValueError(
+                "Fn::GetAtt - The values must contain "
+                "the logicalNameOfResource and attributeName."
+            )
+
+        logical_id, attribute = argument
+
+        if not isinstance(logical_id, str) or not isinstance(attribute, str):
+            raise TypeError(
+                "Fn::GetAtt - logicalNameOfResource and attributeName must be String."
+            )
+
+        return partial(cls, logical_id, attribute), []
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        return functions.get_att_expression(template, self.logical_id, self.attribute)
+
+    def argument(self, children: List[Any]):
+        return ListType([StringType(self.logical_id), StringType(self.attribute)])
+
+
+class GetAZs(Function):
+    """Fn::GetAZs, the availability zones of the region."""
+
+    __slots__ = ()
+
+    name = "Fn::GetAZs"
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        (region,) = children
+
+        return functions.get_azs(template, region)
+
+
+class ImportValue(Function):
+    """Fn::ImportValue, an output of another stack."""
+
+    __slots__ = ()
+
+    name = "Fn::ImportValue"
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        (name,) = children
+
+        return functions.import_value(template, name)
+
+
+class Join(Function):
+    """Fn::Join, which joins a list of values with a delimiter."""
+
+    __slots__ = ("delimiter",)
+
+    name = "Fn::Join"
+    sizes = range(2, 3)
+    detail = "The values must contain a delimiter and a list of items to join."
+
+    def __init__(
+        self, delimiter: str, children: Tuple[Node, ...], key: Optional[Hashable] = None
+    ) -> None:
+        super().__init__(children, key)
+        self.delimiter = delimiter
+
+    @classmethod
+    def parse(cls, argument: Any):
+        delimiter, items = _values(cls, argument)
+
+        if not isinstance(delimiter, str):
+            raise TypeError(
+                "Fn::Join-- The first value must be a String and the second a List or String."
+            )
+
+        return partial(cls, delimiter), [items]
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        (items,) = children
+
+        return functions.join_expression(StringType(self.delimiter), items)
+
+    def argument(self, children: List[Any]):
+        return ListType([StringType(self.delimiter), *children])
+
+
+class Select(Function):
+    """Fn::Select, which picks a value from a list by its index."""
+
+    __slots__ = ("index",)
+
+    name = "Fn::Select"
+    sizes = range(2, 3)
+    detail = "The values must contain an index and a list of items to select from."
+
+    def __init__(
+        self, index: int, children: Tuple[Node, ...], key: Optional[Hashable] = None
+    ) -> None:
+        super().__init__(children, key)
+        self.index = index
+
+    @classmethod
+    def parse(cls, argument: Any):
+        index, items = _values(cls, argument)
+
+        return partial(cls, index if isinstance(index, int) else int(index)), [items]
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        (items,) = children
+
+        return functions.select_expression(self.index, items)
+
+    def argument(self, children: List[Any]):
+        return ListType([NumberType(self.index), *children])
+
+
+class Split(Function):
+    """Fn::Split, which splits a string into a list."""
+
+    __slots__ = ("delimiter",)
+
+    name = "Fn::Split"
+    sizes = range(2, 3)
+    detail = "The values must contain a delimiter and a String to split."
+
+    def __init__(
+        self, delimiter: str, children: Tuple[Node, ...], key: Optional[Hashable] = None
+    ) -> None:
+        super().__init__(children, key)
+        self.delimiter = delimiter
+
+    @classmethod
+    def parse(cls, argument: Any):
+        delimiter, source_string = _values(cls, argument)
+
+        if not isinstance(delimiter, str):
+            raise TypeError(
+                "Fn::Split-- The first value must be a String and the second a String."
+            )
+
+        return partial(cls, delimiter), [source_string]
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        (source_string,) = children
+
+        return functions.split_expression(self.delimiter, source_string)
+
+    def argument(self, children: List[Any]):
+        return ListType([StringType(self.delimiter), *children])
+
+
+class Sub(Function):
+    """Fn::Sub, a string with variables in it."""
+
+    __slots__ = ("source", "names")
+
+    name = "Fn::Sub"
+    sizes = range(2, 3)
+    detail = "The values must contain a source string and a Map of variables."
+
+    def __init__(
+        self,
+        source: str,
+        names: Optional[Tuple[str, ...]],
+        children: Tuple[Node, ...],
+        key: Optional[Hashable] = None,
+    ) -> None:
+        super().__init__(children, key)
+        self.source = source
+        # The names of the variables in the Map of the List version
+        self.names = names
+
+    @classmethod
+    def parse(cls, argument: Any):
+        if isinstance(argument, str):
+            return partial(cls, argument, None), []
+
+        if not isinstance(argument, list):
+            raise TypeError(
+                f"Fn::Sub - The input must be a String or List, not {type(argument).__name__}."
+            )
+
+        source, variables = _values(cls, argument)
+
+        if not isinstance(source, str) or not isinstance(variables, dict):
+            raise TypeError(
+                "Fn::Sub - The first value must be a String and the second a Map."
+            )
+
+        return partial(cls, source, tuple(variables)), list(variables.values())
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        local_vars = dict(zip(self.names or (), children))
+
+        return functions.sub_expression(template, self.source, local_vars)
+
+    def argument(self, children: List[Any]):
+        if self.names is None:
+            return StringType(self.source)
+
+        return ListType(
+            [StringType(self.source), MapType(dict(zip(self.names, children)))]
+        )
+
+
+class Transform(Function):
+    """Fn::Transform, which can't be converted to Terraform."""
+
+    __slots__ = ()
+
+    name = "Fn::Transform"
+
+    def convert(self, template: "TemplateConverter", children: List[Any]):
+        (value,) = children
+
+        return functions.transform(template, value)
+
+
+class Unresolved(Node):
+    """A function whose argument doesn't have the right shape.
+
+    The argument is still compiled and lowered, for the comment that replaces the
+    function.
+    """
+
+    __slots__ = ("name", "error", "children", "key")
+
+    def __init__(
+        self,
+        name: str,
+        error: Exception,
+        children: Tuple[Node, ...],
+        key: Optional[Hashable] = None,
+    ) -> None:
+        self.name = name
+        self.error = error
+        self.children = children
+        self.key = key
+
+    def lower(self, template: "TemplateConverter", children: List[Any]):
+        (value,) = children
+
+        return _unresolved(self.name, value, self.error)
+
+
+# The node of each intrinsic function except Ref and Condition
+FUNCTIONS: Dict[str, Type[Function]] = {
+    function.name: function
+    for function in (
+        And,
+        Equals,
+        If,
+        Not,
+        Or,
+        Base64,
+        Cidr,
+        FindInMap,
+        GetAtt,
+        GetAZs,
+        ImportValue,
+        Join,
+        Select,
+        Split,
+        Sub,
+        Transform,
+    )
+}
+
+
+def compile_value(  # noqa: max-complexity=13
+    value: Any,
+    allowed_func: "functions.Dispatch",
+    prev_func: Optional[str] = None,
+    cache: Optional[Dict[Hashable, Node]] = None,
+    frozen: Optional[Dict[int, Any]] = None,
+) -> Node:
+    """Compiles a value from a Cloudformation template.
+
+    Args:
+        value (Any): Could be a dict, list, str or int.
+        allowed_func (functions.Dispatch): The functions allowed in the value.
+        prev_func (Optional[str]): The function the value is nested in.
+        cache (Optional[Dict[Hashable, Node]]): The nodes of frozen subtrees that
+            were already compiled.
+        frozen (Optional[Dict[int, Any]]): The frozen subtrees by node_id, from
+            the same freeze as the cache. Only these subtrees are shared, a node_id
+            means nothing to the values frozen with another table.
+
+    Raises:
+        ValueError: If a function is not allowed to be nested where it is.
+
+    Returns:
+        Node: The compiled value.
+    """
+
+    # The nodes that don't have a parent yet, the last ones are the next children
+    built: List[Node] = []
+    stack: List[Any] = [(value, allowed_func, prev_func, None)]
+
+    while stack:
+        current = stack.pop()
+
+        if isinstance(current, _Build):
+            count = current.count
+            children = tuple(built[len(built) - count :])
+            del built[len(built) - count :]
+            node = current.make(children, current.key)
+
+            if cache is not None and current.key is not None:
+                cache[current.key] = node
+
+            built.append(node)
+            continue
+
+        if isinstance(current, Node):
+            built.append(current)
+            continue
+
+        value, allowed_func, prev_func, key = current
+
+        if key is not None and cache is not None:
+            cached = cache.get(key)
+
+            if cached is not None:
+                built.append(cached)
+                continue
+
+        if isinstance(value, dict):
+            function = _find_function(value, allowed_func, prev_func)
+
+            if function is None:
+                names = tuple(value)
+                stack.append(_Build(_map(names), len(names), key))
+                stack.extend(
+                    [
+                        _map_value(value, name, allowed_func, prev_func, frozen)
+                        for name in reversed(names)
+                    ]
+                )
+                continue
+
+            name, argument = function
+
+            if name == "Ref":
+                stack.append(Ref(argument))
+            elif name == "Condition":
+                stack.append(Condition(argument))
+            else:
+                allowed = functions.ALLOWED_FUNCTIONS[name]
+                make, values = _parse(name, argument)
+
+                stack.append(_Build(make, len(values), key))
+                stack.extend(
+                    [_child(item, allowed, name, frozen) for item in reversed(values)]
+                )
+        elif isinstance(value, list):
+            stack.append(_Build(Sequence, len(value), key))
+            stack.extend(
+                [
+                    _child(item, allowed_func, prev_func, frozen)
+                    for item in reversed(value)
+                ]
+            )
+        elif cache is not None and isinstance(value, str):
+            # Equal strings are compiled to one node, like equal subtrees
+            scalar_key = (str, value)
+            scalar = cache.get(scalar_key)
+
+            if scalar is None:
+                scalar = cache.setdefault(scalar_key, Scalar(value))
+
+            stack.append(scalar)
+        else:
+            stack.append(Scalar(value))
+
+    return built[0]
+
+
+def lower(template: "TemplateConverter", node: Node) -> Any:
+    """Converts a compiled value to its Terraform equivalent.
+
+    The children of a node are lowered in order before the node itself, so the
+    converters are called in the same order as the values in the template.
+
+    Args:
+        template (TemplateConverter): The template being converted.
+        node (Node): The compiled value.
+
+    Returns:
+        Any: The Terraform value.
+    """
+
+    blocks = template.post_proccess_blocks
+    cache = blocks.lowered
+
+    results: List[Any] = []
+
+    # Each node is visited before its children, then again with the blocks version
+    # from before they were lowered
+    stack: List[Tuple[Node, Optional[int]]] = [(node, None)]
+
+    while stack:
+        current, version = stack.pop()
+        children = current.children
+
+        if version is None:
+            key = current.key
+
+            if key is not None and key in cache:
+                results.append(cache[key])
+                continue
+
+            version = blocks.version
+
+            if children:
+                stack.append((current, version))
+                stack.extend((child, None) for child in reversed(children))
+                continue
+
+        count = len(children)
+        lowered = results[len(results) - count :]
+        del results[len(results) - count :]
+
+        result = current.lower(template, lowered)
+
+        # Not if a block was added while it was lowered, the result could depend on it
+        if current.key is not None and blocks.version == version:
+            cache[current.key] = result
+
+        results.append(result)
+
+    return results[0]
+
+
+def scalar_type(value: Any) -> Callable[[Any], TerraformType]:
+    """Finds the Terraform type of a scalar value.
+
+    Args:
+        value (Any): A string, number, boolean or date.
+
+    Raises:
+        Exception: If the value is not a known type.
+
+    Returns:
+        Callable[[Any], TerraformType]: Makes the Terraform value.
+    """
+
+    if isinstance(value, bool):
+        return BooleanType
+    elif isinstance(value, str):
+        return StringType
+    elif isinstance(value, (int, float)):
+        return NumberType
+    elif isinstance(value, datetime.date):
+        return _date_type
+    else:
+        log.error(f"Found type {type(value)} with value {value}")
+        raise Exception(f"Unknown value {value}, in resolve function.")
+
+
+def _date_type(value: datetime.date) -> TerraformType:
+    return StringType(str(value))
+
+
+def _find_function(
+    data: dict, allowed_func: "functions.Dispatch", prev_func: Optional[str]
+) -> Optional[Tuple[str, Any]]:
+    """Finds the function a map calls, if it calls one.
+
+    Args:
+        data (dict): The map from the template.
+        allowed_func (functions.Dispatch): The functions allowed in the map.
+        prev_func (Optional[str]): The function the map is nested in.
+
+    Raises:
+        ValueError: If the function is not allowed to be nested in prev_func.
+
+    Returns:
+        Optional[Tuple[str, Any]]: The name of the function and its argument.
+    """
+
+    for key, value in data.items():
+        if key == "Ref":
+            return key, value
+
+        # Takes care of the tricky 'Condition' key
+        if key == "Condition":
+            # The real fix is to not resolve every key/value in the entire
+            # cloudformation template. We should only attempt to resolve what is needed,
+            # like outputs and resource properties.
+            # https://docs.aws.amazon.com/AWSCloudFormation/latest/UserGuide/intrinsic-function-reference.html
+            if "Properties" in data or "Value" in data:
+                continue
+
+            # If it's an intrinsic func, otherwise it's a normal key like in an IAM role
+            if is_condition_func(value):
+                return key, value
+
+            continue
+
+        if "Fn::" not in key:
+            continue
+
+        if key not in allowed_func:
+            raise ValueError(f"{key} not allowed to be nested in {prev_func}.")
+
+        return key, value
+
+    return None
+
+
+def _map_value(
+    data: dict,
+    name: str,
+    allowed_func: "functions.Dispatch",
+    prev_func: Optional[str],
+    frozen: Optional[Dict[int, Any]],
+) -> Any:
+    value = data[name]
+
+    # The Condition of a resource or output is kept as it is
+    if name == "Condition" and ("Properties" in data or "Value" in data):
+        return Raw(value)
+
+    return _child(value, allowed_func, prev_func, frozen)
+
+
+def _child(
+    value: Any,
+    allowed_func: "functions.Dispatch",
+    prev_func: Optional[str],
+    frozen: Optional[Dict[int, Any]],
+) -> Tuple[Any, "functions.Dispatch", Optional[str], Optional[Hashable]]:
+    key: Optional[Hashable] = None
+
+    # A frozen subtree compiles the same way every time it's in the same place
+    if isinstance(value, FROZEN) and frozen is not None:
+        node_id = value.node_id
+
+        if frozen.get(node_id) is value:
+            key = (node_id, id(allowed_func), prev_func)
+
+    return (value, allowed_func, prev_func, key)
+
+
+Make = Callable[[Tuple[Node, ...], Optional[Hashable]], Node]
+
+
+class _Build:
+    """Builds a node from the last `count` compiled nodes."""
+
+    __slots__ = ("make", "count", "key")
+
+    def __init__(self, make: Make, count: int, key: Optional[Hashable]) -> None:
+        self.make = make
+        self.count = count
+        self.key = key
+
+
+def _map(names: Tuple[str, ...]) -> Make:
+    return lambda children, key: Map(names, children, key)
+
+
+def _parse(name: str, argument: Any) -> Tuple[Make, List[Any]]:
+    try:
+        return FUNCTIONS[name].parse(argument)
+    except Exception as e:
+        # Converted to a comment when it's lowered, like any function that fails
+        return partial(Unresolved, name, e), [argument]
+
+
+def _values(function: Type[Function], argument: Any) -> List[Any]:
+    if not isinstance(argument, list):
+        raise TypeError(
+            f"{function.name} - The values must be a List, not {type(argument).__name__}."
+        )
+
+    if function.sizes is not None and len(argument) not in function.sizes:
+        raise ValueError(f"{function.name} - {function.detail}")
+
+    return argument
+
+
+def _unresolved(name: str, value: Any, error: Exception) -> CommentType:
+    return CommentType(f"Unable to resolve {name} with value: {value} because {error}")
+
+
+# All the other Cloudformation intrinsic functions start with `Fn:` but for some reason
+# the Condition function does not. This can be problem because
+#  `Condition` is a valid key in an IAM policy but its value is always a Map.
+def is_condition_func(value: Any) -> bool:
+    """Checks if the 'Condition' key is a instrinsic function.
+
+    Args:
+        value (Any): The value of the 'Condition' key.
+
+    Returns:
+        bool: True if we think this `Condition` key is an instrinsic function.
+    """
+    if isinstance(value, str):
+        return True
+
+    return False
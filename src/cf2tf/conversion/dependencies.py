@@ -0,0 +1,262 @@
+"""Finds the dependencies between the resources of a Cloudformation template.
+
+Resources depend on each other through `Ref`, `Fn::GetAtt`, the variables of
+`Fn::Sub` and `DependsOn`. The graph can be built from the parsed template,
+before any of it is converted.
+
+The Mappings and Conditions that resources and outputs use are found the same
+way, so the unused ones don't have to be converted at all.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from cf2tf.conversion import substitution
+
+log = logging.getLogger("cf2tf")
+
+
+class DependencyGraph:
+    """The resources of a template and the resources each one depends on."""
+
+    def __init__(self, dependencies: Dict[str, Set[str]]) -> None:
+        # The keys are kept in template order, which makes every traversal stable
+        self.dependencies = dependencies
+
+        self.dependents: Dict[str, Set[str]] = {node: set() for node in dependencies}
+
+        for node, requires in dependencies.items():
+            for dependency in requires:
+                self.dependents[dependency].add(node)
+
+    def __contains__(self, logical_id: object) -> bool:
+        return logical_id in self.dependencies
+
+    def __len__(self) -> int:
+        return len(self.dependencies)
+
+    def topological_order(self) -> List[str]:
+        """Orders the resources so that each one comes after its dependencies.
+
+        Resources that are not ordered by a dependency keep their template order.
+        Resources in a dependency cycle are added at the end in template order.
+
+        Returns:
+            List[str]: The logical ID of every resource.
+        """
+
+        position = {node: pos for pos, node in enumerate(self.dependencies)}
+        remaining = {
+            node: len(requires) for node, requires in self.dependencies.items()
+        }
+
+        ready = [node for node, count in remaining.items() if not count]
+        order: List[str] = []
+
+        while ready:
+            node = min(ready, key=position.__getitem__)
+            ready.remove(node)
+            order.append(node)
+
+            for dependent in self.dependents[node]:
+                remaining[dependent] -= 1
+
+                if not remaining[dependent]:
+                    ready.append(dependent)
+
+        if len(order) < len(self.dependencies):
+            ordered = set(order)
+            cycle = [node for node in self.dependencies if node not in ordered]
+            log.debug(f"Found a dependency cycle between {cycle}")
+            order.extend(cycle)
+
+        return order
+
+    def closure(self, logical_ids: Iterable[str]) -> Set[str]:
+        """Finds the given resources and everything they depend on.
+
+        Args:
+            logical_ids (Iterable[str]): The resources to start from.
+
+        Returns:
+            Set[str]: The logical ID of every resource that is needed.
+        """
+
+        needed: Set[str] = set()
+        stack = [logical_id for logical_id in logical_ids if logical_id in self]
+
+        while stack:
+            node = stack.pop()
+
+            if node in needed:
+                continue
+
+            needed.add(node)
+            stack.extend(self.dependencies[node] - needed)
+
+        return needed
+
+
+def build_graph(resources: List[Tuple[str, Any]]) -> DependencyGraph:
+    """Builds the dependency graph for the Resources section of a template.
+
+    Args:
+        resources (List[Tuple[str, Any]]): The logical ID and definition of each resource.
+
+    Returns:
+        DependencyGraph: The dependencies between the resources.
+    """
+
+    logical_ids = {logical_id for logical_id, _ in resources}
+
+    dependencies: Dict[str, Set[str]] = {}
+
+    for logical_id, definition in resources:
+        requires = find_references(definition)
+
+        if isinstance(definition, dict):
+            depends_on = definition.get("DependsOn", [])
+
+            if isinstance(depends_on, str):
+                depends_on = [depends_on]
+
+            if isinstance(depends_on, list):
+                requires.update(name for name in depends_on if isinstance(name, str))
+
+        # Only other resources are part of the graph, not parameters or pseudo parameters
+        dependencies[logical_id] = (requires & logical_ids) - {logical_id}
+
+    return DependencyGraph(dependencies)
+
+
+def find_references(value: Any) -> Set[str]:
+    """Finds the logical IDs referenced by Ref, Fn::GetAtt and Fn::Sub.
+
+    Args:
+        value (Any): A value from a Cloudformation template.
+
+    Returns:
+        Set[str]: The referenced logical IDs.
+    """
+
+    found: Set[str] = set()
+    stack = [value]
+
+    while stack:
+        current = stack.pop()
+
+        if isinstance(current, list):
+            stack.extend(current)
+            continue
+
+        if not isinstance(current, dict):
+            continue
+
+        for key, item in current.items():
+            if key == "Ref" and isinstance(item, str):
+                found.add(item)
+            elif key == "Fn::GetAtt":
+                found.update(_get_att_target(item))
+            elif key == "Fn::Sub":
+                found.update(_sub_targets(item))
+
+                # The values of the Sub variables can use functions too
+                if isinstance(item, list) and len(item) == 2:
+                    stack.append(item[1])
+            else:
+                stack.append(item)
+
+    return found
+
+
+def _get_att_target(value: Any) -> Set[str]:
+    if isinstance(value, str):
+        return {value.split(".")[0]}
+
+    if isinstance(value, list) and value and isinstance(value[0], str):
+        return {value[0]}
+
+    return set()
+
+
+def _sub_targets(value: Any) -> Set[str]:
+    variables: Dict[str, Any] = {}
+
+    if isinstance(value, list) and len(value) == 2:
+        value, variables = value
+
+        if not isinstance(variables, dict):
+            variables = {}
+
+    if not isinstance(value, str):
+        return set()
+
+    # ${Name} and ${Name.Attribute} but not the escaped ${!Literal}
+    targets = {
+        token.logical_id or token.text
+        for token in substitution.parse(value)
+        if token.kind in (substitution.VARIABLE, substitution.ATTRIBUTE)
+    }
+
+    return targets - set(variables)
+
+
+def find_used(  # noqa: max-complexity=13
+    values: Iterable[Any], conditions: Dict[str, Any]
+) -> Tuple[Optional[Set[str]], Set[str]]:
+    """Finds the Mappings and Conditions that are used by some values.
+
+    Conditions that are used can use other Conditions and Mappings, which are
+    also counted as used.
+
+    Args:
+        values (Iterable[Any]): The values to search, like resources and outputs.
+        conditions (Dict[str, Any]): The definition of each condition.
+
+    Returns:
+        Tuple[Optional[Set[str]], Set[str]]: The names of the used Mappings, or None
+        if the name of a mapping is not known until conversion, and the names of
+        the used Conditions.
+    """
+
+    used_maps: Optional[Set[str]] = set()
+    used_conditions: Set[str] = set()
+
+    stack = list(values)
+
+    def use_condition(name: str):
+        if name not in used_conditions:
+            used_conditions.add(name)
+            stack.append(conditions.get(name))
+
+    while stack:
+        current = stack.pop()
+
+        if isinstance(current, list):
+            stack.extend(current)
+            continue
+
+        if not isinstance(current, dict):
+            continue
+
+        for key, item in current.items():
+            if key == "Condition" and isinstance(item, str):
+                use_condition(item)
+                continue
+
+            if key == "Fn::If" and isinstance(item, list) and item:
+                if isinstance(item[0], str):
+                    use_condition(item[0])
+
+                stack.extend(item[1:])
+                continue
+
+            if key == "Fn::FindInMap" and isinstance(item, list) and item:
+                if not isinstance(item[0], str):
+                    used_maps = None
+                elif used_maps is not None:
+                    used_maps.add(item[0])
+
+            stack.append(item)
+
+    return used_maps, used_conditions
@@ -5,17 +5,16 @@ it's Terraform equivalent.
 """
 
 import logging
-import re
 from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
 
 import cf2tf.convert
 import cf2tf.terraform.blocks as hcl2
-import cf2tf.terraform.doc_file as doc_file
+from cf2tf.conversion import substitution
 from cf2tf.terraform.hcl2.custom import LiteralType
 from cf2tf.terraform.hcl2.primitive import NullType, StringType, TerraformType
 
 if TYPE_CHECKING:
-    from cf2tf.convert import TemplateConverter
+    from cf2tf.convert import ResourcePlan, TemplateConverter
 
 log = logging.getLogger("cf2tf")
 
@@ -48,6 +47,22 @@ def base64(_tc: "TemplateConverter", value: Any):
         str: Terraform equivalent expression.
     """
 
+    return base64_expression(value)
+
+
+def base64_expression(value: Any) -> LiteralType:
+    """Encodes a Terraform value with base64.
+
+    Args:
+        value (Any): The Terraform value to encode.
+
+    Raises:
+        TypeError: If value is not a String.
+
+    Returns:
+        LiteralType: Terraform equivalent expression.
+    """
+
     if not isinstance(value, str):
         raise TypeError(
             f"Fn::Base64 - The value must be a String, not {type(value).__name__}."
@@ -84,9 +99,20 @@ def cidr(_tc: "TemplateConverter", values: Any):
             )
         )
 
-    ip_block: str = values[0]
-    count = int(values[1])
-    hostBits = int(values[2])
+    return cidr_expression(values[0], int(values[1]), int(values[2]))
+
+
+def cidr_expression(ip_block: str, count: int, hostBits: int) -> LiteralType:
+    """Splits a CIDR block into subnets.
+
+    Args:
+        ip_block (str): The CIDR block to split, like `10.0.0.0/16`.
+        count (int): The number of subnets.
+        hostBits (int): The number of host bits in each subnet.
+
+    Returns:
+        LiteralType: Terraform equivalent expression.
+    """
 
     mask = 32 - hostBits
 
@@ -124,6 +150,19 @@ def and_(_tc: "TemplateConverter", values: Any):
     if len_ < 2 or len_ > 10:
         raise ValueError("Fn::And - The values must have between 2 and 10 conditions.")
 
+    return and_expression(values)
+
+
+def and_expression(values: Any) -> LiteralType:
+    """Checks that all the conditions are true.
+
+    Args:
+        values (Any): The Terraform values of the conditions.
+
+    Returns:
+        LiteralType: Terraform equivalent expression.
+    """
+
     return LiteralType(f"alltrue({values})")
 
 
@@ -150,7 +189,21 @@ def equals(_tc: "TemplateConverter", values: Any):
     if not len(values) == 2:
         raise ValueError("Fn::Equals - The values must contain two values to compare.")
 
-    return LiteralType(f"{values[0]} == {values[1]}")
+    return equals_expression(values[0], values[1])
+
+
+def equals_expression(left: Any, right: Any) -> LiteralType:
+    """Compares two Terraform values.
+
+    Args:
+        left (Any): The first value.
+        right (Any): The second value.
+
+    Returns:
+        LiteralType: Terraform equivalent expression.
+    """
+
+    return LiteralType(f"{left} == {right}")
 
 
 def if_(_tc: "TemplateConverter", values: Any):
@@ -190,9 +243,22 @@ def if_(_tc: "TemplateConverter", values: Any):
             f"Fn::If - The Condition should be a String, not {type(condition).__name__}."
         )
 
-    condition = condition.strip('"')
+    return if_expression(condition, values[1], values[2])
 
-    return LiteralType(f"local.{condition} ? {values[1]} : {values[2]}")
+
+def if_expression(condition: str, true_value: Any, false_value: Any) -> LiteralType:
+    """Picks one of two Terraform values with a condition of the template.
+
+    Args:
+        condition (str): The name of the condition.
+        true_value (Any): The value when the condition is true.
+        false_value (Any): The value when the condition is false.
+
+    Returns:
+        LiteralType: Terraform equivalent expression.
+    """
+
+    return LiteralType(f"local.{condition} ? {true_value} : {false_value}")
 
 
 def not_(_tc: "TemplateConverter", values: Any):
@@ -218,7 +284,18 @@ def not_(_tc: "TemplateConverter", values: Any):
     if not len(values) == 1:
         raise ValueError("Fn::Not - The values must contain a single Condition.")
 
-    condition: Any = values[0]
+    return not_expression(values[0])
+
+
+def not_expression(condition: Any) -> LiteralType:
+    """Negates a condition.
+
+    Args:
+        condition (Any): The Terraform value of the condition.
+
+    Returns:
+        LiteralType: Terraform equivalent expression.
+    """
 
     # todo This needs fixed because python True needs to be terraform true
     return LiteralType(f"!{condition}")
@@ -247,15 +324,26 @@ def or_(_tc: "TemplateConverter", values: Any):
     len_: int = len(values)
 
     if len_ < 2 or len_ > 10:
-        raise ValueError("Fn::Not - The values must have between 2 and 10 conditions.")
+        raise ValueError("Fn::Or - The values must have between 2 and 10 conditions.")
+
+    return or_expression(values)
+
+
+def or_expression(values: List[Any]) -> LiteralType:
+    """Checks that any of the conditions is true.
+
+    Args:
+        values (List[Any]): The Terraform values of the conditions.
+
+    Returns:
+        LiteralType: Terraform equivalent expression.
+    """
 
     # todo This isnt really correct. We need a way to convert a python
     # data object into a valid terraform argument value, which includes proper quoting
     # and maybe even indentation
 
-    values = _terraform_list(values)
-
-    return LiteralType(f"anytrue({values})")
+    return LiteralType(f"anytrue({_terraform_list(values)})")
 
 
 def condition(template: "TemplateConverter", name: Any):
@@ -277,9 +365,6 @@ def condition(template: "TemplateConverter", name: Any):
             f"Fn::Condition - The value must be a String, not {type(name).__name__}."
         )
 
-    # This is a side effect of how we handle StringType
-    name = name.strip('"')
-
     # todo We could check if condition is a key in the local args
     # if name not in template.template["Conditions"]:
     #     raise KeyError(
@@ -318,16 +403,30 @@ def find_in_map(template: "TemplateConverter", values: Any):
             )
         )
 
-    map_name = values[0]
-    top_key = values[1]
-    second_key = values[2]
+    return find_in_map_expression(template, values[0], values[1], values[2])
+
+
+def find_in_map_expression(
+    template: "TemplateConverter", map_name: Any, top_key: Any, second_key: Any
+) -> LiteralType:
+    """Looks up a value in the mappings of the locals block.
+
+    Args:
+        template (TemplateConverter): The template being converted.
+        map_name (Any): The Terraform value of the map name.
+        top_key (Any): The Terraform value of the top level key.
+        second_key (Any): The Terraform value of the second level key.
+
+    Raises:
+        ValueError: If there isn't exactly one locals block.
+        Exception: If the locals block has no mappings.
+
+    Returns:
+        LiteralType: Terraform equivalent expression.
+    """
 
     # First we need to make sure that locals is a block present in the Terraform template.
-    blocks = [
-        block
-        for block in template.post_proccess_blocks
-        if isinstance(block, hcl2.Locals)
-    ]
+    blocks = template.post_proccess_blocks.of_type(hcl2.Locals)
 
     if not blocks:
         raise ValueError("Unable to find a locals block in the template.")
@@ -437,28 +536,55 @@ def _get_att_list(template: "TemplateConverter", values: Any):
             "Fn::GetAtt - logicalNameOfResource and attributeName must be String."
         )
 
-    nested_prop: Optional[List[str]] = None
+    return get_att_expression(template, cf_name, cf_property)
 
-    if "." in cf_property:
-        cf_property, *nested_prop = cf_property.split(".")
+
+def get_att_expression(
+    template: "TemplateConverter", cf_name: str, cf_property: str
+) -> TerraformType:
+    """Finds the Terraform attribute of a resource.
+
+    Args:
+        template (TemplateConverter): The template being converted.
+        cf_name (str): The logical ID of the resource.
+        cf_property (str): The name of the Cloudformation attribute.
+
+    Raises:
+        KeyError: If the resource is not in the template.
+
+    Returns:
+        TerraformType: Terraform equivalent expression.
+    """
 
     log.debug(f"Fn::GetAtt - Looking up resource {cf_name}")
-    cf_resource = template.resource_lookup(cf_name, ["Resources"])
+    symbol = template.lookup_symbol(cf_name, ["Resources"])
 
-    if not cf_resource:
+    if not symbol or not symbol.definition:
         raise KeyError(f"Fn::GetAtt - Resource {cf_name} not found in template.")
 
-    resource_type = cf_resource.get("Type")
-
-    if not resource_type:
+    if not symbol.plan:
         raise Exception("Type is required")
 
-    docs_path = template.search_manager.find(resource_type)
-    log.debug(f"Fn::GetAtt - Parsing attributes for {docs_path}")
-    valid_arguments, valid_attributes = doc_file.parse_attributes(docs_path)
+    cached = template.cached_reference(symbol, cf_property)
+
+    if cached is not None:
+        return cached
+
+    result = _resolve_get_att(symbol.tf_name, symbol.plan, cf_property)
+
+    return template.cache_reference(symbol, cf_property, result)
+
+
+def _resolve_get_att(tf_name: str, plan: "ResourcePlan", cf_property: str):
+    nested_prop: Optional[List[str]] = None
+
+    if "." in cf_property:
+        cf_property, *nested_prop = cf_property.split(".")
 
-    tf_name = cf2tf.convert.pascal_to_snake(cf_name)
-    tf_type = cf2tf.convert.create_resource_type(docs_path)
+    valid_arguments = plan.valid_arguments
+    valid_attributes = plan.valid_attributes
+
+    tf_type = plan.tf_type
 
     if nested_prop:
         prop = f"{cf_property}.{'.'.join(nested_prop)}"
@@ -534,15 +660,11 @@ def get_azs(template: "TemplateConverter", region: Any):
 
     region = region
 
-    data = [
-        data for data in template.post_proccess_blocks if isinstance(data, hcl2.Data)
-    ]
+    az_data = hcl2.Data(
+        "available", "aws_availability_zones", {"state": StringType("available")}
+    )
 
-    if not data:
-        az_data = hcl2.Data(
-            "available", "aws_availability_zones", {"state": StringType("available")}
-        )
-        template.post_proccess_blocks.insert(0, az_data)
+    template.add_post_block(az_data)
 
     return az_data.ref("names")
 
@@ -607,9 +729,31 @@ def join(_tc: "TemplateConverter", values: Any):
             "Fn::Join-- The first value must be a String and the second a List or String."
         )
 
+    return join_expression(delimiter, items)
+
+
+def join_expression(delimiter: Any, items: Any) -> LiteralType:
+    """Joins a list of Terraform values into a string.
+
+    Args:
+        delimiter (Any): The Terraform value of the delimiter.
+        items (Any): The Terraform list, or an expression that returns a list.
+
+    Raises:
+        TypeError: If items is not a List or String.
+
+    Returns:
+        LiteralType: Terraform equivalent expression.
+    """
+
     if isinstance(items, str):
         return LiteralType(f"join({delimiter}, {items})")
 
+    if not isinstance(items, list):
+        raise TypeError(
+            "Fn::Join-- The first value must be a String and the second a List or String."
+        )
+
     return LiteralType(f"join({delimiter}, {_terraform_list(items)})")
 
 
@@ -652,7 +796,23 @@ def select(_tc: "TemplateConverter", values: Any):
         )
 
     index: int = values[0] if isinstance(values[0], int) else int(values[0])
-    items: Union[List[Any], str] = values[1]
+
+    return select_expression(index, values[1])
+
+
+def select_expression(index: int, items: Any) -> LiteralType:
+    """Selects one of a list of Terraform values.
+
+    Args:
+        index (int): The index of the value.
+        items (Any): The Terraform list, or an expression that returns a list.
+
+    Raises:
+        TypeError: If index is not a Number or items is not a List or String.
+
+    Returns:
+        LiteralType: Terraform equivalent expression.
+    """
 
     if not isinstance(index, int) or not isinstance(items, (list, str)):
         log.error(f"Index is type {type(index)} with value {index}")
@@ -661,15 +821,10 @@ def select(_tc: "TemplateConverter", values: Any):
             "Fn::Select - The first value must be a Number and the second a List or String."
         )
 
-    if isinstance(items, str):
-        items = items
-    else:
+    if not isinstance(items, str):
         items = _terraform_list(items)
 
-    try:
-        return LiteralType(f"element({items}, {index})")
-    except IndexError:
-        raise IndexError("Fn::Select - List size is smaller than the Index given.")
+    return LiteralType(f"element({items}, {index})")
 
 
 def split(_tc: "TemplateConverter", values: Any):
@@ -701,13 +856,29 @@ def split(_tc: "TemplateConverter", values: Any):
             )
         )
 
-    delimiter: str
-    source_string: str
+    if not isinstance(values[0], str):
+        raise TypeError(
+            "Fn::Split-- The first value must be a String and the second a String."
+        )
 
-    if isinstance(values[0], str) and isinstance(values[1], str):
-        delimiter = values[0]
-        source_string = values[1]
-    else:
+    return split_expression(values[0], values[1])
+
+
+def split_expression(delimiter: str, source_string: Any) -> LiteralType:
+    """Splits a Terraform string into a list.
+
+    Args:
+        delimiter (str): The delimiter, as it is in the template.
+        source_string (Any): The Terraform value of the string to split.
+
+    Raises:
+        TypeError: If source_string is not a String.
+
+    Returns:
+        LiteralType: Terraform equivalent expression.
+    """
+
+    if not isinstance(source_string, str):
         raise TypeError(
             "Fn::Split-- The first value must be a String and the second a String."
         )
@@ -747,32 +918,19 @@ def sub_s(template: "TemplateConverter", value: str):
         template (Configuration): The template being tested.
         value (str): The String containing variables.
 
+    Raises:
+        TypeError: If value is not a String.
+
     Returns:
         str: Terraform equivalent expression.
     """
 
-    def replace_var(m):
-        var = m.group(1)
-
-        if "." in var:
-            parts = var.split(".")
-
-            resouce_id = parts[0]
-
-            attributes = ".".join(parts[1:])
-
-            result = _get_att_list(template, [resouce_id, attributes])
-        else:
-            result = ref(template, var)
-
-        return wrap_in_curlys(result)
-
-    reVar = r"(?!\$\{\!)\$\{(\w+[^}]*)\}"
-
-    if re.search(reVar, value):
-        return StringType(re.sub(reVar, replace_var, value).replace("${!", "${"))
+    if not isinstance(value, str):
+        raise TypeError(
+            f"Fn::Sub - The input must be a String, not {type(value).__name__}."
+        )
 
-    return StringType(value.replace("${!", "${"))
+    return sub_expression(template, value, {})
 
 
 # todo This needs to create local variables in the template.
@@ -810,34 +968,52 @@ def sub_l(template: "TemplateConverter", values: List):
             "Fn::Sub - The first value must be a String and the second a Map."
         )
 
-    def replace_var(m) -> str:
-        var: str = m.group(1)
+    return sub_expression(template, source_string, local_vars)
 
-        if var in local_vars:
-            result = local_vars[var]
-            return wrap_in_curlys(result)
 
-        if "." in var:
-            parts = var.split(".")
+def sub_expression(
+    template: "TemplateConverter", source: str, local_vars: Dict[str, Any]
+) -> StringType:
+    """Replaces the variables in an `Fn::Sub` source string.
 
-            resouce_id = parts[0]
+    Args:
+        template (TemplateConverter): The template being converted.
+        source (str): The source string, with its ${} variables.
+        local_vars (Dict[str, Any]): The Terraform values of the variables in the
+            Map of the List version.
 
-            attributes = ".".join(parts[1:])
+    Returns:
+        StringType: Terraform equivalent expression.
+    """
 
-            result = _get_att_list(template, [resouce_id, attributes])
-        else:
-            result = ref(template, var)
+    parts: List[str] = []
 
-        return wrap_in_curlys(result)
+    # Long scripts use the same few variables over and over
+    resolved: Dict[str, str] = {}
 
-    reVar = r"(?!\$\{\!)\$\{(\w+[^}]*)\}"
+    for token in substitution.parse(source):
+        if token.kind in (substitution.LITERAL, substitution.ESCAPED):
+            parts.append(token.text)
+            continue
 
-    if re.search(reVar, source_string):
-        return StringType(
-            re.sub(reVar, replace_var, source_string).replace("${!", "${")
-        )
+        text = resolved.get(token.text)
+
+        if text is None:
+            result: Any
+
+            if token.text in local_vars:
+                result = local_vars[token.text]
+            elif token.kind == substitution.ATTRIBUTE:
+                result = get_att_expression(template, token.logical_id, token.attribute)
+            else:
+                result = ref(template, token.text)
 
-    return StringType(source_string.replace("${!", "${"))
+            # Escapes were always replaced in the resolved values too
+            text = resolved[token.text] = wrap_in_curlys(result).replace("${!", "${")
+
+        parts.append(text)
+
+    return StringType("".join(parts))
 
 
 # todo Transform is an AWS native capability with no Terraform equivalent expression.
@@ -867,28 +1043,35 @@ def ref(template: "TemplateConverter", var_name: str):
     if "AWS::" in var_name:
         return handle_pseduo_var(template, var_name)
 
-    cf_param = template.resource_lookup(var_name, ["Parameters"])
+    cf_param = template.lookup_symbol(var_name, ["Parameters"])
+
+    if cf_param and cf_param.definition:
+        return LiteralType(f"var.{cf_param.tf_name}")
 
-    if cf_param:
-        tf_name = cf2tf.convert.pascal_to_snake(var_name)
-        return LiteralType(f"var.{tf_name}")
+    cf_resource = template.lookup_symbol(var_name, ["Resources"])
 
-    cf_resource = template.resource_lookup(var_name, ["Resources"])
+    if cf_resource and cf_resource.definition:
+        cached = template.cached_reference(cf_resource, None)
 
-    if cf_resource:
-        cf_resource_type = cf_resource.get("Type", "")
-        docs_path = template.search_manager.find(cf_resource_type)
-        valid_arguments, valid_attributes = doc_file.parse_attributes(docs_path)
-        tf_name = cf2tf.convert.pascal_to_snake(var_name)
-        tf_type = cf2tf.convert.create_resource_type(docs_path)
+        if cached is not None:
+            return cached
+
+        # A resource without a Type is still searched for, like it always was
+        plan = cf_resource.plan or template.resource_plan("")
+        valid_arguments = plan.valid_arguments
+        valid_attributes = plan.valid_attributes
+        tf_name = cf_resource.tf_name
+        tf_type = plan.tf_type
 
         first_attr = valid_attributes[0] if valid_attributes else valid_arguments[0]
-        conditional = cf_resource.get("Condition")
+        conditional = cf_resource.definition.get("Condition")
 
         if conditional is not None:
             tf_name = f"{tf_name}[0]"
 
-        return LiteralType(f"{tf_type}.{tf_name}.{first_attr}")
+        return template.cache_reference(
+            cf_resource, None, LiteralType(f"{tf_type}.{tf_name}.{first_attr}")
+        )
 
     raise ValueError(f"Fn::Ref - {var_name} is not a valid Resource or Parameter.")
 
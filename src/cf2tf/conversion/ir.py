@@ -0,0 +1,232 @@
+"""An immutable representation of the values in a Cloudformation template.
+
+The parsed template is frozen once, before it's converted. Frozen values can't be
+changed, so the same template can be converted more than once and its values can
+be shared between threads without copying them. Every frozen value is hashable
+and has a `key` that identifies its contents, including the type of each scalar,
+so equal subtrees can be found and cached.
+
+Keys are flat. A key holds the `node_id` of each nested value instead of its
+key, and equal keys always get the same `node_id`, so comparing two keys never
+has to walk the values. The node_ids come from a table that is passed in, like
+the one each template is parsed with, so keys and node_ids are only comparable
+between values frozen with the same table. Freezing also shares one copy of each
+subtree that repeats, like the same Tags or policy used by many resources.
+"""
+
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from cf2tf.interning import intern_string
+
+# The node_id of each key that has been seen
+NodeIds = Dict[Hashable, int]
+
+
+class FrozenDict(dict):
+    """A dict that can't be changed once it's created."""
+
+    __slots__ = ("key", "node_id", "_hash")
+
+    def __init__(
+        self,
+        items: Iterable[Tuple[str, Any]] = (),
+        node_ids: Optional[NodeIds] = None,
+    ) -> None:
+        super().__init__(items)
+
+        self.key: Hashable = (
+            "map",
+            tuple(dict.keys(self)),
+            tuple(map(node_key, dict.values(self))),
+        )
+        self.node_id = intern(self.key, node_ids)
+
+        # Only from what == compares, which ignores the order and True == 1
+        self._hash = hash(frozenset(dict.items(self)))
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        return self._hash
+
+    def __reduce__(self):
+        return (_restore, (FrozenDict, list(dict.items(self)), self.key, self.node_id))
+
+    def __copy__(self) -> "FrozenDict":
+        return self
+
+    def __deepcopy__(self, memo) -> "FrozenDict":
+        return self
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("A frozen Cloudformation value can't be changed.")
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __ior__ = _immutable  # type: ignore[assignment]
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    update = _immutable
+
+
+class FrozenList(list):
+    """A list that can't be changed once it's created."""
+
+    __slots__ = ("key", "node_id", "_hash")
+
+    def __init__(
+        self, items: Iterable[Any] = (), node_ids: Optional[NodeIds] = None
+    ) -> None:
+        super().__init__(items)
+
+        self.key: Hashable = ("list", tuple(map(node_key, self)))
+        self.node_id = intern(self.key, node_ids)
+
+        # Only from what == compares, so True and 1 hash the same
+        self._hash = hash(tuple(self))
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        return self._hash
+
+    def __reduce__(self):
+        return (_restore, (FrozenList, list(self), self.key, self.node_id))
+
+    def __copy__(self) -> "FrozenList":
+        return self
+
+    def __deepcopy__(self, memo) -> "FrozenList":
+        return self
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("A frozen Cloudformation value can't be changed.")
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __iadd__ = _immutable  # type: ignore[assignment]
+    __imul__ = _immutable  # type: ignore[assignment]
+    append = _immutable
+    clear = _immutable
+    extend = _immutable
+    insert = _immutable
+    pop = _immutable
+    remove = _immutable
+    reverse = _immutable
+    sort = _immutable
+
+
+def node_key(value: Any) -> Hashable:
+    """A key that is only equal for values with the same contents and types.
+
+    `True == 1` in python, but they are different Cloudformation values.
+
+    Args:
+        value (Any): A frozen value.
+
+    Returns:
+        Hashable: The key of the value.
+    """
+
+    if isinstance(value, FROZEN):
+        return value.node_id
+
+    return (type(value), value)
+
+
+def intern(key: Hashable, node_ids: Optional[NodeIds] = None) -> int:
+    """Finds the node_id of a key.
+
+    Args:
+        key (Hashable): The key of a frozen value.
+        node_ids (Optional[NodeIds]): The node_ids of the keys seen so far,
+            without a table the key is the first of a table of its own.
+
+    Returns:
+        int: The same number for every equal key in the same table.
+    """
+
+    if node_ids is None:
+        return 0
+
+    node_id = node_ids.get(key)
+
+    if node_id is None:
+        node_id = node_ids.setdefault(key, len(node_ids))
+
+    return node_id
+
+
+FROZEN = (FrozenDict, FrozenList)
+
+
+def _restore(cls: type, items: Any, key: Hashable, node_id: int) -> Any:
+    # Unpickled values keep the node_ids of the table they were frozen with
+    frozen = cls(items)
+    frozen.key = key
+    frozen.node_id = node_id
+
+    return frozen
+
+
+def freeze(
+    value: Any,
+    shared: Optional[Dict[int, Any]] = None,
+    node_ids: Optional[NodeIds] = None,
+) -> Any:
+    """Makes an immutable copy of a value from a Cloudformation template.
+
+    Equal subtrees are frozen to the same object and the strings are shared.
+
+    Args:
+        value (Any): A dict, list or scalar from the parsed template.
+        shared (Optional[Dict[int, Any]]): The frozen values by node_id, used to
+            share subtrees between calls.
+        node_ids (Optional[NodeIds]): The node_ids of the keys seen so far, used
+            with `shared` to freeze more values with the same node_ids.
+
+    Returns:
+        Any: The frozen value, scalars are returned as is.
+    """
+
+    if not isinstance(value, (dict, list)) or isinstance(value, FROZEN):
+        return value
+
+    shared = {} if shared is None else shared
+    node_ids = {} if node_ids is None else node_ids
+
+    # Each container is frozen after its children, without recursion
+    frozen: Dict[int, Any] = {}
+    stack: List[Tuple[Any, bool]] = [(value, False)]
+
+    def child(item: Any) -> Any:
+        if isinstance(item, str):
+            return intern_string(item)
+
+        return frozen.get(id(item), item)
+
+    while stack:
+        current, children_frozen = stack.pop()
+
+        if children_frozen:
+            result: Any
+
+            if isinstance(current, dict):
+                result = FrozenDict(
+                    [
+                        (intern_string(name), child(item))
+                        for name, item in current.items()
+                    ],
+                    node_ids,
+                )
+            else:
+                result = FrozenList([child(item) for item in current], node_ids)
+
+            frozen[id(current)] = shared.setdefault(result.node_id, result)
+            continue
+
+        stack.append((current, True))
+
+        for item in current.values() if isinstance(current, dict) else current:
+            if isinstance(item, (dict, list)) and not isinstance(item, FROZEN):
+                stack.append((item, False))
+
+    return frozen[id(value)]
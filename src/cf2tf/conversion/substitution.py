@@ -0,0 +1,108 @@
+"""Parses the source strings of `Fn::Sub`.
+
+A source string is parsed once into tokens, in a single pass, and the tokens are
+cached by the string. Converting the string again only has to resolve the
+variables and join the tokens, which matters for long UserData scripts that are
+full of variables.
+
+The tokens match what the pattern `(?!\\$\\{\\!)\\$\\{(\\w+[^}]*)\\}` used to find.
+A variable starts with a word character and runs to the next `}`, and `${!` is
+an escaped `${` that is kept as it is.
+"""
+
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple
+
+# Plain text from the source string
+LITERAL = "literal"
+
+# A Ref to a parameter, resource or pseudo parameter, like ${AWS::Region}
+VARIABLE = "variable"
+
+# A Fn::GetAtt of a resource, like ${Bucket.Arn}
+ATTRIBUTE = "attribute"
+
+# The escaped ${! which is converted to a literal ${
+ESCAPED = "escaped"
+
+
+class Token(NamedTuple):
+    """A piece of an `Fn::Sub` source string."""
+
+    kind: str
+
+    # The literal text or the whole name of a variable, like `Bucket.Arn`
+    text: str
+
+    # The resource and attribute of an attribute variable
+    logical_id: str = ""
+    attribute: str = ""
+
+
+@lru_cache(maxsize=1024)
+def parse(source: str) -> Tuple[Token, ...]:
+    """Splits an `Fn::Sub` source string into tokens.
+
+    Args:
+        source (str): The source string, with its ${} variables.
+
+    Returns:
+        Tuple[Token, ...]: The tokens, in the same order as the string.
+    """
+
+    tokens: List[Token] = []
+
+    # The start of the literal text that hasn't been added yet
+    literal_start = 0
+    pos = 0
+
+    # Once there is no closing }, none of the following ${ can be variables
+    closed = True
+
+    while True:
+        start = source.find("${", pos)
+
+        if start == -1:
+            break
+
+        first = source[start + 2 : start + 3]
+
+        if first == "!":
+            _add_literal(tokens, source[literal_start:start])
+            tokens.append(Token(ESCAPED, "${"))
+
+            literal_start = pos = start + 3
+            continue
+
+        end = -1
+
+        if closed and (first.isalnum() or first == "_"):
+            end = source.find("}", start + 2)
+            closed = end != -1
+
+        if end == -1:
+            pos = start + 1
+            continue
+
+        _add_literal(tokens, source[literal_start:start])
+        tokens.append(_variable(source[start + 2 : end]))
+
+        literal_start = pos = end + 1
+
+    _add_literal(tokens, source[literal_start:])
+
+    return tuple(tokens)
+
+
+def _add_literal(tokens: List[Token], text: str):
+    if text:
+        tokens.append(Token(LITERAL, text))
+
+
+def _variable(name: str) -> Token:
+    logical_id, dot, attribute = name.partition(".")
+
+    if dot:
+        return Token(ATTRIBUTE, name, logical_id, attribute)
+
+    return Token(VARIABLE, name)
@@ -1,26 +1,43 @@
-import datetime
-import json
 import logging
-import re
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Type
-
-from thefuzz import process  # type: ignore
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
+import cf2tf.conversion.compiler as compiler
 import cf2tf.conversion.expressions as functions
+import cf2tf.conversion.ir as ir
+import cf2tf.parallel as parallel
 import cf2tf.terraform._configuration as config
 import cf2tf.terraform.doc_file as doc_file
+import cf2tf.terraform.match_cache as match_cache
+from cf2tf.conversion.dependencies import find_used
 from cf2tf.conversion.overrides import GLOBAL_OVERRIDES, OVERRIDE_DISPATCH
+from cf2tf.interning import intern_string
+from cf2tf.naming import camel_case_split, find_collisions, pascal_to_snake
 from cf2tf.terraform.blocks import Block, Locals, Output, Resource, Variable
 from cf2tf.terraform.hcl2 import AllTypes
 from cf2tf.terraform.hcl2.complex import ListType, MapType
 from cf2tf.terraform.hcl2.custom import CommentType, LiteralType
-from cf2tf.terraform.hcl2.primitive import (
-    BooleanType,
-    NumberType,
-    StringType,
-    TerraformType,
-)
+from cf2tf.terraform.hcl2.primitive import TerraformType
+from cf2tf.terraform.ngram import NgramIndex
 
 if TYPE_CHECKING:
     from cf2tf.terraform.code import SearchManager
@@ -38,12 +55,23 @@ Manifest = Dict[str, CFResources]
 
 CFDict = Dict[str, Dict[str, Any]]
 
+BlockT = TypeVar("BlockT", bound=Block)
+
+# The sections whose logical IDs are converted to snake case Terraform names
+SNAKE_CASE_SECTIONS = ("Parameters", "Resources", "Outputs")
+
 log = logging.getLogger("cf2tf")
 
 
 class TemplateConverter:
     def __init__(
-        self, template_name: str, cf_template: CFDict, search_manager: "SearchManager"
+        self,
+        template_name: str,
+        cf_template: CFDict,
+        search_manager: "SearchManager",
+        jobs: int = 1,
+        threads: bool = False,
+        lazy: bool = False,
     ) -> None:
         self.name = template_name
         self.cf_template = cf_template
@@ -52,7 +80,37 @@ class TemplateConverter:
         self.all_resources: Optional[CFResources]
         self.manifest: Manifest = {}
 
-        self.post_proccess_blocks: List[Block] = []
+        # The number of processes (or threads) used to convert the resources
+        self.jobs = jobs
+        self.threads = threads
+
+        # Only convert the Mappings and Conditions that are used
+        self.lazy = lazy
+
+        self._post_blocks = BlockRegistry()
+
+        # Worker threads each convert resources with their own post process blocks
+        self._local = threading.local()
+
+        # Guards the plans, symbols and counters shared by worker threads
+        self._lock = threading.RLock()
+
+        # Every resource of the same type is converted using the same plan
+        self.plans: Dict[str, ResourcePlan] = {}
+
+        # The logical IDs of each section, used to resolve references
+        self.symbols: SymbolTable = {}
+        self._symbol_sources: Manifest = {}
+
+        self.reference_hits = 0
+        self.reference_misses = 0
+
+        # The compiled subtrees of the template, so each unique subtree is compiled once
+        self.compiled: Dict[Hashable, compiler.Node] = {}
+
+        # The frozen subtrees of the template by node_id, values frozen anywhere else
+        # have node_ids from another table and are never cached
+        self.frozen: Dict[int, Any] = {}
 
         # This is not only the sections we are interested in, but the conversion order,
         # which is also important.
@@ -64,30 +122,80 @@ class TemplateConverter:
             "Outputs",
         ]
 
-    @staticmethod
-    def _json_encoder(value: Any) -> Any:
-        if isinstance(value, (datetime.date, datetime.datetime)):
-            return value.isoformat()
-        else:
-            return value
+    @property
+    def post_proccess_blocks(self) -> "BlockRegistry":
+        blocks = getattr(self._local, "post_blocks", None)
+
+        return self._post_blocks if blocks is None else blocks
+
+    @post_proccess_blocks.setter
+    def post_proccess_blocks(self, blocks: Iterable[Block]):
+        self._post_blocks = BlockRegistry(blocks)
+
+    @contextmanager
+    def use_post_blocks(
+        self, blocks: "BlockRegistry"
+    ) -> Generator["BlockRegistry", None, None]:
+        """Uses different post process blocks in the current thread.
+
+        Args:
+            blocks (BlockRegistry): The blocks to use in this thread.
+        """
+
+        self._local.post_blocks = blocks
+
+        try:
+            yield blocks
+        finally:
+            self._local.post_blocks = None
 
     def add_post_block(self, block: Block):
-        block_refs = [block.base_ref() for block in self.post_proccess_blocks]
+        if self.post_proccess_blocks.add(block):
+            log.debug(f"Added post process block {block.base_ref()}")
+
+    def resource_plan(self, resource_type: str) -> "ResourcePlan":
+        """Gets the conversion plan for a Cloudformation resource type.
+
+        Args:
+            resource_type (str): The Cloudformation resource type.
+
+        Returns:
+            ResourcePlan: The plan shared by all resources of this type.
+        """
 
-        log.debug(block_refs)
+        plan = self.plans.get(resource_type)
 
-        if block.base_ref() not in block_refs:
-            self.post_proccess_blocks.insert(0, block)
+        if plan is not None:
+            return plan
 
-    def get_block_by_type(self, block_type: Type[Block]):
-        for block in self.post_proccess_blocks:
-            if isinstance(block, block_type):
-                return block
+        with self._lock:
+            if resource_type not in self.plans:
+                docs_path = self.search_manager.find(resource_type)
+
+                log.debug(f"Found documentation file {docs_path}")
+
+                self.plans[resource_type] = ResourcePlan(resource_type, docs_path)
+
+            return self.plans[resource_type]
+
+    def get_block_by_type(self, block_type: Type[BlockT]) -> Optional[BlockT]:
+        return self.post_proccess_blocks.first(block_type)
 
     def convert(self) -> config.Configuration:
         # Should convert the given cloudformation template to a terraform configuration
         self.parse_template()
 
+        if self.lazy:
+            self.remove_unused()
+
+        # Found before any resource is converted, so forked workers inherit the docs
+        # instead of each searching for the same resource types again
+        self.search_manager.find_all(
+            resource["Type"]
+            for _, resource in self.manifest.get("Resources", [])
+            if isinstance(resource, dict) and resource.get("Type")
+        )
+
         # This is used by the resolve values function
         self.all_resources = [
             resource for _, resources in self.manifest.items() for resource in resources
@@ -96,12 +204,24 @@ class TemplateConverter:
         # These are the resources converted directly from cloudformation
         tf_resources = self.convert_to_tf(self.manifest)
 
+        log.debug(
+            f"Reference cache had {self.reference_hits} hits and {self.reference_misses} misses."
+        )
+
         # We also dynamicly generate new resources like the locals block
         tf_resources[:0] = self.post_proccess_blocks
 
         return config.Configuration(tf_resources)
 
-    def parse_template(self):
+    def parse_template(self) -> None:
+        # Subtrees that repeat in any section are frozen to the same object
+        self.frozen = {}
+        node_ids: ir.NodeIds = {}
+
+        # The compiled and lowered subtrees are cached by the previous node_ids
+        self.compiled.clear()
+        self.post_proccess_blocks.lowered.clear()
+
         for section in self.valid_sections:
             if section not in self.cf_template:
                 log.debug(
@@ -111,27 +231,152 @@ class TemplateConverter:
 
             section_values = self.cf_template[section]
 
-            self.manifest[section] = list(section_values.items())
+            # The template itself is never changed, so it can be converted again
+            self.manifest[section] = [
+                (intern_string(name), ir.freeze(value, self.frozen, node_ids))
+                for name, value in section_values.items()
+            ]
 
+        # Only the counts, dumping a deeply nested template could hit the recursion limit
         log.debug(
-            f"Parsed the following resources for processing:\n{json.dumps(self.manifest, default=self._json_encoder)}"
+            f"Parsed {', '.join(f'{len(items)} {name}' for name, items in self.manifest.items())}"
         )
 
-    def resource_lookup(
-        self, resource_name: str, sections: List[str]
-    ) -> Optional[Dict[str, Any]]:
+        self.build_symbols()
+
+        for section in SNAKE_CASE_SECTIONS:
+            logical_ids = [name for name, _ in self.manifest.get(section, [])]
+
+            for tf_name, same_name in find_collisions(logical_ids).items():
+                log.warning(
+                    f"The {section} {same_name} all convert to the Terraform name {tf_name}."
+                )
+
+    def remove_unused(self):
+        """Removes the Mappings and Conditions that no resource or output uses."""
+
+        used_maps, used_conditions = find_used(
+            [
+                definition
+                for section in ("Resources", "Outputs")
+                for _, definition in self.manifest.get(section, [])
+            ],
+            dict(self.manifest.get("Conditions", [])),
+        )
+
+        sections = {"Conditions": used_conditions}
+
+        # A mapping name that is only known at conversion time could be any of them
+        if used_maps is not None:
+            sections["Mappings"] = used_maps
+
+        for section, used in sections.items():
+            if section not in self.manifest:
+                continue
+
+            kept = [item for item in self.manifest[section] if item[0] in used]
+
+            log.debug(
+                f"Skipping {len(self.manifest[section]) - len(kept)} unused {section}"
+            )
+
+            if kept:
+                self.manifest[section] = kept
+            else:
+                del self.manifest[section]
+
+    def build_symbols(self):
+        """Builds the symbol table from the sections of the manifest."""
+
+        self.symbols = {
+            section: {
+                logical_id: Symbol(logical_id, section, definition)
+                for logical_id, definition in resources
+            }
+            for section, resources in self.manifest.items()
+        }
+
+        # Remember what the table was built from, so we know when it's out of date
+        self._symbol_sources = dict(self.manifest)
+
+    def lookup_symbol(self, logical_id: str, sections: List[str]) -> Optional["Symbol"]:
+        """Finds a logical ID in the given sections of the template.
+
+        Args:
+            logical_id (str): The logical ID of a parameter, resource, etc.
+            sections (List[str]): The sections to search, in order.
+
+        Returns:
+            Optional[Symbol]: The symbol if it was found.
+        """
+
+        if not self._symbols_current():
+            with self._lock:
+                if not self._symbols_current():
+                    self.build_symbols()
+
         for section in sections:
-            section_resources = self.manifest.get(section)
+            symbol = self.symbols.get(section, {}).get(logical_id)
+
+            if symbol is None:
+                continue
 
-            if section_resources:
-                section_map: Dict[str, Dict[str, Any]] = dict(section_resources)  # type: ignore
+            if symbol.plan is None and section == "Resources" and symbol.resource_type:
+                symbol.plan = self.resource_plan(symbol.resource_type)
 
-                if resource_name in section_map:
-                    resource = section_map[resource_name]
-                    return resource
+            return symbol
 
         return None
 
+    def cached_reference(
+        self, symbol: "Symbol", attribute: Optional[str]
+    ) -> Optional[TerraformType]:
+        """Gets a reference to a symbol that was already resolved.
+
+        Args:
+            symbol (Symbol): The symbol being referenced.
+            attribute (Optional[str]): The attribute or None for a Ref.
+
+        Returns:
+            Optional[TerraformType]: The resolved reference if there is one.
+        """
+
+        result = symbol.references.get(attribute)
+
+        with self._lock:
+            if result is None:
+                self.reference_misses += 1
+            else:
+                self.reference_hits += 1
+
+        if result is not None:
+            log.debug(f"Using cached reference {result} for {symbol.logical_id}")
+
+        return result
+
+    def cache_reference(
+        self, symbol: "Symbol", attribute: Optional[str], result: TerraformType
+    ) -> TerraformType:
+        symbol.references[attribute] = result
+
+        return result
+
+    def _symbols_current(self) -> bool:
+        if self.manifest.keys() != self._symbol_sources.keys():
+            return False
+
+        return all(
+            self.manifest[section] is self._symbol_sources[section]
+            for section in self.manifest
+        )
+
+    def resource_lookup(
+        self, resource_name: str, sections: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        symbol = self.lookup_symbol(resource_name, sections)
+
+        return symbol.definition if symbol else None
+
     def convert_to_tf(self, manifest: Manifest):
         tf_resources: List[Block] = []
 
@@ -145,15 +390,19 @@ class TemplateConverter:
 
         return tf_resources
 
-    def resolve_values(  # noqa: max-complexity=13
+    def resolve_values(
         self,
         data: Any,
-        allowed_func: functions.Dispatch,
+        allowed_func: "functions.Dispatch",
         prev_func: Optional[str] = None,
     ):
-        """Recurses through a Cloudformation template. Solving all
+        """Walks through a Cloudformation template. Solving all
         references and variables along the way.
 
+        The value is compiled first, which checks how the functions are nested,
+        then lowered to Terraform. Subtrees of the template that repeat are only
+        compiled and lowered once.
+
         Args:
             data (Any): Could be a dict, list, str or int.
 
@@ -161,73 +410,11 @@ class TemplateConverter:
             Any: Return the rendered data structure.
         """
 
-        if isinstance(data, dict):
-            key: str
-
-            for key in list(data):
-                value = data[key]
-
-                if key == "Ref":
-                    return functions.ref(self, value)
-
-                # This takes care of keys that not intrinsic functions,
-                #  except for the condition func
-                if "Fn::" not in key and key != "Condition":
-                    data[key] = self.resolve_values(value, allowed_func, prev_func)
-                    continue
-
-                # Takes care of the tricky 'Condition' key
-                if key == "Condition":
-                    # The real fix is to not resolve every key/value in the entire
-                    # cloudformation template. We should only attempt to resolve what is needed,
-                    # like outputs and resource properties.
-                    # https://docs.aws.amazon.com/AWSCloudFormation/latest/UserGuide/intrinsic-function-reference.html
-
-                    if "Properties" in data or "Value" in data:
-                        continue
-
-                    # If it's an intrinsic func
-                    if is_condition_func(value):
-                        return functions.condition(self, value)
-
-                    # Normal key like in an IAM role
-                    data[key] = self.resolve_values(value, allowed_func, prev_func)
-                    continue
-
-                if key not in allowed_func:
-                    raise ValueError(f"{key} not allowed to be nested in {prev_func}.")
-
-                prev_func = key
-
-                value = self.resolve_values(
-                    value, functions.ALLOWED_FUNCTIONS[key], prev_func
-                )
-
-                try:
-                    return allowed_func[key](self, value)
-                except Exception as e:
-                    return CommentType(
-                        f"Unable to resolve {key} with value: {value} because {e}"
-                    )
-
-            return MapType(data)
-        elif isinstance(data, list):
-            resolved_list_values = [
-                self.resolve_values(item, allowed_func, prev_func) for item in data
-            ]
+        node = compiler.compile_value(
+            data, allowed_func, prev_func, self.compiled, self.frozen
+        )
 
-            return ListType(resolved_list_values)
-        elif isinstance(data, bool):
-            return BooleanType(data)
-        elif isinstance(data, str):
-            return StringType(data)
-        elif isinstance(data, (int, float)):
-            return NumberType(data)
-        elif isinstance(data, datetime.date):
-            return StringType(str(data))
-        else:
-            log.error(f"Found type {type(data)} with value {data}")
-            raise Exception(f"Unknown value {data}, in resolve function.")
+        return compiler.lower(self, node)
 
     def convert_parameters(self, parameters: CFResources):
         tf_vars: List[Variable] = []
@@ -284,7 +471,7 @@ class TemplateConverter:
 
         resolved_values = self.resolve_values(dict_conditons, functions.ALL_FUNCTIONS)
 
-        log.debug(resolved_values)
+        log.debug(f"Converted conditions {list(resolved_values)}")
 
         local_block = self.get_block_by_type(Locals)
 
@@ -299,81 +486,78 @@ class TemplateConverter:
         return []
 
     def convert_resources(self, resources: CFResources):
-        tf_resources: List[Resource] = []
+        if self.jobs > 1 and len(resources) > 1:
+            if self.threads and parallel.free_threaded():
+                return parallel.convert_resources_threaded(self, resources, self.jobs)
 
-        for resource_id, resource_values in resources:
-            log.debug(f"Converting Cloudformation resource {resource_id} to Terraform.")
-
-            tf_name = pascal_to_snake(resource_id)
-            log.debug(f"Converted name to {tf_name}")
+            if not self.threads and parallel.available():
+                return parallel.convert_resources(self, resources, self.jobs)
 
-            resource_type = resource_values.get("Type")
+        tf_resources: List[Resource] = []
 
-            if not resource_type:
-                raise Exception("Type is required")
+        for resource_id, resource_values in resources:
+            tf_resources.append(self.convert_resource(resource_id, resource_values))
 
-            docs_path = self.search_manager.find(resource_type)
+        return tf_resources
 
-            log.debug(f"Found documentation file {docs_path}")
+    def convert_resource(self, resource_id: str, resource_values: ResourceValues):
+        log.debug(f"Converting Cloudformation resource {resource_id} to Terraform.")
 
-            tf_type = create_resource_type(docs_path)
+        tf_name = pascal_to_snake(resource_id)
+        log.debug(f"Converted name to {tf_name}")
 
-            log.debug(f"Converted type from {resource_values.get('Type')} to {tf_type}")
+        resource_type = resource_values.get("Type")
 
-            valid_arguments, valid_attributes = doc_file.parse_attributes(docs_path)
+        if not resource_type:
+            raise Exception("Type is required")
 
-            log.debug(
-                f"Parsed the following arguments from the documentation: \n{valid_arguments}"
-            )
+        plan = self.resource_plan(resource_type)
 
-            log.debug(
-                f"Parsed the following attributes from the documentation: \n{valid_attributes}"
-            )
+        docs_path = plan.docs_path
+        tf_type = plan.tf_type
+        valid_arguments = list(plan.valid_arguments)
+        valid_attributes = list(plan.valid_attributes)
 
-            properties: Dict[str, Any] = resource_values.get("Properties", {})
+        properties: Dict[str, Any] = resource_values.get("Properties", {})
 
-            arguments = MapType(properties)
+        arguments = MapType(properties)
 
-            if properties:
-                log.debug(
-                    "Converting the intrinsic functions to Terraform expressions..."
-                )
+        if properties:
+            log.debug("Converting the intrinsic functions to Terraform expressions...")
 
-                resolved_values = self.resolve_values(
-                    properties, functions.ALL_FUNCTIONS
-                )
+            resolved_values = self.resolve_values(properties, functions.ALL_FUNCTIONS)
 
-                log.debug("Overiding Properties")
+            log.debug("Overiding Properties")
 
-                overrided_values = perform_resource_overrides(
-                    tf_type, resolved_values, self
-                )
+            overrided_values = perform_resource_overrides(
+                tf_type, resolved_values, self
+            )
 
-                overrided_values = perform_global_overrides(
-                    tf_type, overrided_values, self
-                )
+            overrided_values = perform_global_overrides(tf_type, overrided_values, self)
 
-                log.debug("Converting property names to argument names...")
+            log.debug("Converting property names to argument names...")
 
-                arguments = props_to_args(overrided_values, valid_arguments, docs_path)
+            arguments = props_to_args(
+                overrided_values, valid_arguments, docs_path, plan
+            )
 
-                log.debug(f"Converted properties to {arguments}")
+            # Only the names, rendering the values is as slow as writing them
+            log.debug(f"Converted properties to {list(arguments)}")
 
-            conditional = resource_values.get("Condition")
+        conditional = resource_values.get("Condition")
 
-            if conditional is not None:
-                condition_map = {"count": LiteralType(f"local.{conditional} ? 1 : 0")}
-                arguments = MapType({**condition_map, **arguments})
+        if conditional is not None:
+            condition_map = {"count": LiteralType(f"local.{conditional} ? 1 : 0")}
+            arguments = MapType({**condition_map, **arguments})
 
-            resource = Resource(
-                tf_name, tf_type, arguments, valid_arguments, valid_attributes
-            )
-            tf_resources.append(resource)
+        resource = Resource(
+            tf_name, tf_type, arguments, valid_arguments, valid_attributes
+        )
 
-            # Add space for easier to read logging output
-            add_space()
+        # Add space for easier to read logging output
+        add_space()
 
-        return tf_resources
+        return resource
 
     def convert_outputs(self, outputs: CFResources):
         tf_outputs: List[Output] = []
@@ -393,7 +577,7 @@ class TemplateConverter:
 
             resolved_args = self.resolve_values(converted_args, functions.ALL_FUNCTIONS)
 
-            log.debug(f"Converted properties to {resolved_args}")
+            log.debug(f"Converted properties to {list(resolved_args)}")
 
             tf_outputs.append(Output(tf_name, resolved_args))
 
@@ -444,26 +628,45 @@ def find_section(tf_attribute_name: str, docs_path: Path):
     return result_name
 
 
-def pascal_to_snake(name: str):
-    name = re.sub("(.)([A-Z][a-z]+)", r"\1_\2", name)
-    return re.sub("([a-z0-9])([A-Z])", r"\1_\2", name).lower()
+def matcher(search_term: str, search_items: List[str], score_cutoff=0):
+    items = tuple(search_items)
 
+    index = _search_index(items)
 
-def matcher(search_term: str, search_items: List[str], score_cutoff=0):
-    result: Optional[Tuple[str, int]] = process.extractOne(
-        # search_term, search_items, scorer=fuzz.token_sort_ratio
-        search_term,
-        search_items,
-        score_cutoff=score_cutoff,
-    )
+    # Most names match exactly, which is much faster than a fuzzy match
+    exact_result: Optional[Tuple[str, int]] = index.exact_match(search_term)
+
+    if exact_result:
+        return exact_result
+
+    # Fuzzy matches from previous runs are saved in the match cache
+    cache = match_cache.active_cache()
+
+    if cache:
+        found, cached_result = cache.get(
+            search_term, _search_digest(items), score_cutoff
+        )
+
+        if found:
+            return cached_result
+
+    result: Optional[Tuple[str, int]] = index.extract_one(search_term, score_cutoff)
+
+    if cache:
+        cache.put(search_term, _search_digest(items), score_cutoff, result)
 
     return result
 
 
-def camel_case_split(text: str) -> str:
-    items = re.findall(r"[A-Z\d](?:[a-z]+|\d|[A-Z]*(?=[A-Z]|$))", text)
+@lru_cache(maxsize=512)
+def _search_index(search_items: Tuple[str, ...]) -> NgramIndex:
+    # The same lists of arguments and sections are searched over and over
+    return NgramIndex(search_items)
 
-    return " ".join(items) if items else text
+
+@lru_cache(maxsize=512)
+def _search_digest(search_items: Tuple[str, ...]) -> str:
+    return match_cache.items_digest(search_items)
 
 
 def create_resource_type(doc_path: Path):
@@ -482,10 +685,189 @@ def contains_functions(self, data: Dict[str, Any]):
     return False
 
 
+class Symbol:
+    """A logical ID from one of the sections of the Cloudformation template."""
+
+    def __init__(self, logical_id: str, section: str, definition: Any) -> None:
+        self.logical_id = logical_id
+        self.section = section
+        self.definition = definition
+        self.tf_name = pascal_to_snake(logical_id)
+
+        # Only resources have a plan and it's not looked up until it's needed
+        self.plan: Optional[ResourcePlan] = None
+
+        # Resolved Ref (None) and Fn::GetAtt (attribute name) expressions
+        self.references: Dict[Optional[str], TerraformType] = {}
+
+    @property
+    def resource_type(self) -> Optional[str]:
+        if not isinstance(self.definition, dict):
+            return None
+
+        return self.definition.get("Type")
+
+    @property
+    def tf_type(self) -> Optional[str]:
+        return self.plan.tf_type if self.plan else None
+
+    @property
+    def attributes(self) -> List[str]:
+        return self.plan.valid_attributes if self.plan else []
+
+
+SymbolTable = Dict[str, Dict[str, Symbol]]
+
+
+class ResourcePlan:
+    """The conversion decisions for one Cloudformation resource type.
+
+    Finding the documentation, matching property names to argument names and
+    finding nested block sections is the same for every resource of a type, so
+    it is worked out once and reused for every resource.
+    """
+
+    def __init__(self, resource_type: str, docs_path: Path) -> None:
+        self.resource_type = resource_type
+        self.docs_path = docs_path
+        self.tf_type = create_resource_type(docs_path)
+
+        log.debug(f"Converted type from {resource_type} to {self.tf_type}")
+
+        self.valid_arguments, self.valid_attributes = doc_file.parse_attributes(
+            docs_path
+        )
+
+        log.debug(
+            f"Parsed the following arguments from the documentation: \n{self.valid_arguments}"
+        )
+
+        log.debug(
+            f"Parsed the following attributes from the documentation: \n{self.valid_attributes}"
+        )
+
+        self.matches: Dict[Tuple[str, Tuple[str, ...]], Optional[Tuple[str, int]]] = {}
+        self.sections: Dict[str, str] = {}
+        self.section_args: Dict[str, List[str]] = {}
+
+    def match_property(
+        self, prop_name: str, search_items: List[str]
+    ) -> Optional[Tuple[str, int]]:
+        key = (prop_name, tuple(search_items))
+
+        if key not in self.matches:
+            search_term = camel_case_split(prop_name)
+
+            log.debug(f"Searching for {search_term} instead of {prop_name}")
+
+            self.matches[key] = matcher(search_term, search_items, 80)
+
+        return self.matches[key]
+
+    def find_section(self, tf_attribute_name: str) -> str:
+        if tf_attribute_name not in self.sections:
+            self.sections[tf_attribute_name] = find_section(
+                tf_attribute_name, self.docs_path
+            )
+
+        return self.sections[tf_attribute_name]
+
+    def read_section(self, section_name: str) -> List[str]:
+        if section_name not in self.section_args:
+            self.section_args[section_name] = doc_file.read_section(
+                self.docs_path, section_name
+            )
+
+        return self.section_args[section_name]
+
+
+class BlockRegistry:
+    """The blocks generated during a conversion, indexed by reference and type."""
+
+    def __init__(self, blocks: Iterable[Block] = ()) -> None:
+        self._blocks: Deque[Block] = deque()
+        self._refs: Dict[str, Block] = {}
+        self._types: Dict[type, Deque[Block]] = {}
+
+        # Changes every time a block is added
+        self.version = 0
+
+        # Lowered subtrees of the template, some functions depend on the blocks
+        # so these are only kept until the next block is added
+        self.lowered: Dict[Hashable, Any] = {}
+
+        for block in blocks:
+            self.append(block)
+
+    def __iter__(self) -> Iterator[Block]:
+        return iter(self._blocks)
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def __contains__(self, block: object) -> bool:
+        return any(item is block for item in self._types.get(type(block), ()))
+
+    def add(self, block: Block) -> bool:
+        """Adds a block to the front unless a block with the same reference exists.
+
+        Args:
+            block (Block): The block to add.
+
+        Returns:
+            bool: If the block was added.
+        """
+
+        if block.base_ref() in self._refs:
+            return False
+
+        self.insert_first(block)
+
+        return True
+
+    def insert_first(self, block: Block):
+        self._blocks.appendleft(block)
+        self._index(block, first=True)
+
+    def append(self, block: Block):
+        self._blocks.append(block)
+        self._index(block, first=False)
+
+    def get(self, base_ref: str) -> Optional[Block]:
+        return self._refs.get(base_ref)
+
+    def first(self, block_type: Type[BlockT]) -> Optional[BlockT]:
+        blocks = self._types.get(block_type)
+
+        return blocks[0] if blocks else None  # type: ignore
+
+    def of_type(self, block_type: Type[BlockT]) -> List[BlockT]:
+        return list(self._types.get(block_type, ()))  # type: ignore
+
+    def _index(self, block: Block, first: bool):
+        self.version += 1
+        self.lowered.clear()
+
+        base_ref = block.base_ref()
+
+        if first or base_ref not in self._refs:
+            self._refs[base_ref] = block
+
+        # Blocks are indexed by each of their classes to match isinstance lookups
+        for block_type in type(block).__mro__:
+            blocks = self._types.setdefault(block_type, deque())
+
+            if first:
+                blocks.appendleft(block)
+            else:
+                blocks.append(block)
+
+
 def props_to_args(
     cf_props: Dict[str, AllTypes],
     valid_tf_arguments: List[str],
     docs_path: Path,
+    plan: Optional[ResourcePlan] = None,
 ):
     # Search works better if we split the words apart, but we have to put it back together later
     search_items = [item.replace("_", " ") for item in valid_tf_arguments]
@@ -494,7 +876,7 @@ def props_to_args(
 
     for prop_name, prop_value in cf_props.items():
         tf_arg_name, tf_arg_value = convert_prop_to_arg(
-            prop_name, prop_value, search_items, docs_path
+            prop_name, prop_value, search_items, docs_path, plan
         )
 
         converted_attrs[tf_arg_name] = tf_arg_value
@@ -505,13 +887,22 @@ def props_to_args(
 
 
 def convert_prop_to_arg(
-    prop_name: str, prop_value: AllTypes, search_items: List[str], docs_path: Path
+    prop_name: str,
+    prop_value: AllTypes,
+    search_items: List[str],
+    docs_path: Path,
+    plan: Optional[ResourcePlan] = None,
 ) -> Tuple[str, AllTypes]:
-    search_term = camel_case_split(prop_name)
+    result: Optional[Tuple[str, int]]
+
+    if plan:
+        result = plan.match_property(prop_name, search_items)
+    else:
+        search_term = camel_case_split(prop_name)
 
-    log.debug(f"Searching for {search_term} instead of {prop_name}")
+        log.debug(f"Searching for {search_term} instead of {prop_name}")
 
-    result = matcher(search_term, search_items, 80)
+        result = matcher(search_term, search_items, 80)
 
     if not result:
         log.debug(f"No match found for {prop_name}, commenting out this argument.")
@@ -521,7 +912,7 @@ def convert_prop_to_arg(
     attribute_match, ranking = result
 
     # Putting the underscore back in
-    tf_arg_name = attribute_match.replace(" ", "_")
+    tf_arg_name = intern_string(attribute_match.replace(" ", "_"))
 
     log.debug(f"Converted {prop_name} to {tf_arg_name} with {ranking}% match.")
 
@@ -532,7 +923,7 @@ def convert_prop_to_arg(
         return tf_arg_name, prop_value
 
     try:
-        tf_arg, tf_values = parse_subsection(tf_arg_name, prop_value, docs_path)
+        tf_arg, tf_values = parse_subsection(tf_arg_name, prop_value, docs_path, plan)
         return tf_arg, tf_values
     except Exception:
         raise Exception(
@@ -541,7 +932,10 @@ def convert_prop_to_arg(
 
 
 def parse_subsection(
-    arg_name: str, prop_value: AllTypes, docs_path: Path
+    arg_name: str,
+    prop_value: AllTypes,
+    docs_path: Path,
+    plan: Optional[ResourcePlan] = None,
 ) -> Tuple[str, AllTypes]:
     """Checks for a subsection and parses it if found. If a subsection
     is not found it will return arg_name and prop_value unchanged.
@@ -549,12 +943,16 @@ def parse_subsection(
     Args:
         arg_name (str): The Terraform argument name.
         prop_value (Any): The Cloudformation property to be converted to Terraform argument.
+        docs_path (Path): The documentation file for the resource.
+        plan (Optional[ResourcePlan]): Caches the section lookups for this resource type.
 
     Returns:
         Tuple[str, Any]: The arg_name and prop_value.
     """
 
-    section_name = find_section(arg_name, docs_path)
+    section_name = (
+        plan.find_section(arg_name) if plan else find_section(arg_name, docs_path)
+    )
 
     if not section_name:
         if isinstance(prop_value, dict):
@@ -563,7 +961,11 @@ def parse_subsection(
 
         return arg_name, prop_value
 
-    valid_sub_args = doc_file.read_section(docs_path, section_name)
+    valid_sub_args = (
+        plan.read_section(section_name)
+        if plan
+        else doc_file.read_section(docs_path, section_name)
+    )
 
     if not valid_sub_args:
         log.warning(f"{arg_name} has section in {docs_path} but section was empty.")
@@ -589,13 +991,15 @@ def parse_subsection(
                 sub_args.append(CommentType(sub_props))
 
             try:
-                sub_args.append(props_to_args(sub_props, valid_sub_args, docs_path))
+                sub_args.append(
+                    props_to_args(sub_props, valid_sub_args, docs_path, plan)
+                )
             except:  # noqa: E722
                 sub_args.append(CommentType(sub_props))
 
         return arg_name, ListType(sub_args)
 
-    sub_attrs = props_to_args(prop_value, valid_sub_args, docs_path)
+    sub_attrs = props_to_args(prop_value, valid_sub_args, docs_path, plan)
     return arg_name, Block(arg_name, (), sub_attrs)
 
 
@@ -645,21 +1049,3 @@ def perform_global_overrides(
             params = override(tc, params)
 
     return params
-
-
-# All the other Cloudformation intrinsic functions start with `Fn:` but for some reason
-# the Condition function does not. This can be problem because
-#  `Condition` is a valid key in an IAM policy but its value is always a Map.
-def is_condition_func(value: Any) -> bool:
-    """Checks if the 'Condition' key is a instrinsic function.
-
-    Args:
-        value (Any): The value of the 'Condition' key.
-
-    Returns:
-        bool: True if we think this `Condition` key is an instrinsic function.
-    """
-    if isinstance(value, str):
-        return True
-
-    return False
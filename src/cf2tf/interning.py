@@ -0,0 +1,88 @@
+"""Shares one copy of the strings that repeat in a template.
+
+Large templates repeat the same names and values thousands of times, like `Name`,
+`Key`, ARNs and the logical IDs used by Ref. Each of them is kept once, and the
+Terraform strings made from them are shared too, which is safe because they are
+never changed.
+
+The tables last as long as the process, so they stop growing at `MAX_ENTRIES`.
+Long strings like scripts and policies rarely repeat and are not shared at all.
+"""
+
+from typing import Dict, Tuple, Type, TypeVar
+
+# Strings longer than this are not shared
+MAX_LENGTH = 256
+
+# Nothing new is shared once a table has this many entries
+MAX_ENTRIES = 200_000
+
+S = TypeVar("S", bound=str)
+
+_strings: Dict[str, str] = {}
+
+_values: Dict[Tuple[type, str], str] = {}
+
+
+def intern_string(value: S) -> S:
+    """Finds the shared copy of a string.
+
+    Args:
+        value (S): A string from a template, anything else is returned as is.
+
+    Returns:
+        S: An equal string, the same object for every equal value.
+    """
+
+    # Subclasses like the Terraform types are not plain strings
+    if type(value) is not str or len(value) > MAX_LENGTH:
+        return value
+
+    shared = _strings.get(value)
+
+    if shared is not None:
+        return shared  # type: ignore[return-value]
+
+    if len(_strings) >= MAX_ENTRIES:
+        return value
+
+    return _strings.setdefault(value, value)  # type: ignore[return-value]
+
+
+def intern_value(cls: Type[S], value: str) -> S:
+    """Finds the shared Terraform value of a string.
+
+    New values get their `value` attribute set here, since shared values are never
+    changed after they are made.
+
+    Args:
+        cls (Type[S]): A Terraform string type, like `StringType`.
+        value (str): The value for the Terraform type.
+
+    Returns:
+        S: The value as cls, the same object for every equal value.
+    """
+
+    if type(value) is not str or len(value) > MAX_LENGTH:
+        return _make(cls, value)
+
+    key = (cls, value)
+
+    shared = _values.get(key)
+
+    if shared is not None:
+        return shared  # type: ignore[return-value]
+
+    made = _make(cls, value)
+
+    if len(_values) >= MAX_ENTRIES:
+        return made
+
+    return _values.setdefault(key, made)  # type: ignore[return-value]
+
+
+def _make(cls: Type[S], value: str) -> S:
+    made = str.__new__(cls, value)
+    made.value = intern_string(value)  # type: ignore[attr-defined]
+
+    return made
@@ -0,0 +1,118 @@
+"""Converts Cloudformation names to Terraform names and search terms.
+
+The same logical IDs, property names, resource types and doc file names are
+converted over and over while a template is converted. The patterns are compiled
+once and each function remembers its most recent results.
+"""
+
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+from cf2tf.interning import intern_string
+
+# The number of names each function remembers
+CACHE_SIZE = 4096
+
+_WORD_START = re.compile("(.)([A-Z][a-z]+)")
+_WORD_END = re.compile("([a-z0-9])([A-Z])")
+_CAMEL_WORD = re.compile(r"[A-Z\d](?:[a-z]+|\d|[A-Z]*(?=[A-Z]|$))")
+
+# Sometimes file names have v2 in them.
+_VERSION = re.compile(r"(v\d)")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def pascal_to_snake(name: str) -> str:
+    """Converts a logical ID to a Terraform name, like `MyBucket` to `my_bucket`.
+
+    Args:
+        name (str): The logical ID.
+
+    Returns:
+        str: The name in snake case.
+    """
+
+    name = _WORD_START.sub(r"\1_\2", name)
+    return intern_string(_WORD_END.sub(r"\1_\2", name).lower())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def camel_case_split(text: str) -> str:
+    """Splits a property name into words, like `BucketName` to `Bucket Name`.
+
+    Args:
+        text (str): The property name.
+
+    Returns:
+        str: The words separated by spaces, or the text if it has no words.
+    """
+
+    items = _CAMEL_WORD.findall(text)
+
+    return " ".join(items) if items else text
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def resource_type_to_name(resource_type: str) -> str:
+    """Converts a Cloudformation Resource Type into something more search friendly.
+
+    Args:
+        resource_type (str): The Cloudformation resource type.
+
+    Returns:
+        str: A search term that can be used to match resources in the TF docs.
+    """
+
+    search_tokens = resource_type.replace("::", " ").replace("AWS", " ").split(" ")
+
+    # I will leave the logic for camel case splitting here for now.
+    # in case we want to use it later.
+    # for i, token in enumerate(search_tokens):
+    #     if len(token) >= 4:
+    #         search_tokens[i] = camel_case_split(token)
+
+    return " ".join(search_tokens).lower().strip()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def transform_file_name(og_name: str) -> str:
+    """Converts a doc file name to a search term, like `s3_bucket.html.markdown`.
+
+    Args:
+        og_name (str): The name of the documentation file.
+
+    Returns:
+        str: The name without its extension and with spaces between the words.
+    """
+
+    no_extensions = og_name.split(".")[0]
+
+    no_underscores = no_extensions.replace("_", " ")
+
+    split_numbers = _VERSION.split(no_underscores)
+
+    return " ".join([item.strip() for item in split_numbers])
+
+
+def find_collisions(logical_ids: Iterable[str]) -> Dict[str, List[str]]:
+    """Finds the logical IDs that convert to the same Terraform name.
+
+    Terraform names must be unique, so `MyBucket` and `My_Bucket` can't both be
+    converted as they are.
+
+    Args:
+        logical_ids (Iterable[str]): The logical IDs of one section of a template.
+
+    Returns:
+        Dict[str, List[str]]: The logical IDs of each Terraform name that is used
+        more than once, in template order.
+    """
+
+    names: Dict[str, List[str]] = defaultdict(list)
+
+    for logical_id in logical_ids:
+        names[pascal_to_snake(logical_id)].append(logical_id)
+
+    return {name: ids for name, ids in names.items() if len(ids) > 1}
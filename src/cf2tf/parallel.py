@@ -0,0 +1,296 @@
+"""Converts the resources of a template in a pool of worker processes or threads.
+
+Most of the time spent converting a large template is fuzzy matching, which is
+CPU bound. The Resources section is split into shards that are converted by
+forked worker processes. Each worker reports the post process blocks every
+resource added or changed. These are replayed in resource order, so the result
+is the same as converting the resources one at a time.
+
+On free-threaded Python builds the shards can be converted by threads instead,
+which avoids forking and pickling the results. Each thread works on its own copy
+of the post process blocks, so the changes are replayed the same way.
+"""
+
+import copy
+import logging
+import math
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import cf2tf.terraform.match_cache as match_cache
+from cf2tf.terraform.blocks import Block, Resource
+
+if TYPE_CHECKING:
+    from cf2tf.convert import BlockRegistry, CFResources, TemplateConverter
+
+log = logging.getLogger("cf2tf")
+
+# Each worker gets a few shards, so one slow shard doesn't hold up the others
+SHARDS_PER_JOB = 4
+
+Shard = Tuple[int, int]
+
+# The blocks a resource added and the arguments it set on existing blocks
+BlockChanges = Tuple[List[Block], List[Tuple[str, Dict[str, Any]]]]
+
+ResourceResult = Tuple[Resource, BlockChanges]
+
+# The template being converted, inherited by the forked workers
+_work: Optional[Tuple["TemplateConverter", "CFResources"]] = None
+
+
+def available() -> bool:
+    """Checks if the worker processes can be forked on this platform.
+
+    Returns:
+        bool: If resources can be converted in parallel.
+    """
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        return True
+
+    log.warning("Parallel conversion needs fork, converting one resource at a time.")
+
+    return False
+
+
+def free_threaded() -> bool:
+    """Checks if threads can run Python code in parallel, without the GIL.
+
+    Returns:
+        bool: If resources can be converted in parallel by threads.
+    """
+
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+
+    if is_gil_enabled is not None and not is_gil_enabled():
+        return True
+
+    log.info("Threads need a free-threaded Python, converting one resource at a time.")
+
+    return False
+
+
+def convert_resources(
+    template: "TemplateConverter", resources: "CFResources", jobs: int
+) -> List[Resource]:
+    """Converts resources using a pool of worker processes.
+
+    Args:
+        template (TemplateConverter): The template the resources belong to.
+        resources (CFResources): The resources to convert.
+        jobs (int): The number of worker processes.
+
+    Returns:
+        List[Resource]: The converted resources, in the same order.
+    """
+
+    global _work
+
+    shards = make_shards(len(resources), jobs * SHARDS_PER_JOB)
+
+    log.debug(f"Converting {len(resources)} resources in {len(shards)} shards.")
+
+    _work = (template, resources)
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=init_worker,
+        ) as executor:
+            results = list(executor.map(_convert_shard, shards))
+    finally:
+        _work = None
+
+    return merge_results(template, results)
+
+
+def convert_resources_threaded(
+    template: "TemplateConverter", resources: "CFResources", jobs: int
+) -> List[Resource]:
+    """Converts resources using a pool of threads.
+
+    Args:
+        template (TemplateConverter): The template the resources belong to.
+        resources (CFResources): The resources to convert.
+        jobs (int): The number of threads.
+
+    Returns:
+        List[Resource]: The converted resources, in the same order.
+    """
+
+    shards = make_shards(len(resources), jobs * SHARDS_PER_JOB)
+
+    log.debug(f"Converting {len(resources)} resources in {len(shards)} shards.")
+
+    def convert_shard(shard: Shard) -> List[ResourceResult]:
+        # Every shard starts from the blocks that existed before any resources
+        blocks = copy.deepcopy(template.post_proccess_blocks)
+
+        with template.use_post_blocks(blocks):
+            return convert_range(template, resources, shard)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(convert_shard, shards))
+
+    return merge_results(template, results)
+
+
+def convert_range(
+    template: "TemplateConverter", resources: "CFResources", shard: Shard
+) -> List[ResourceResult]:
+    """Converts a shard of resources and records the changes to the post process blocks.
+
+    Args:
+        template (TemplateConverter): The template the resources belong to.
+        resources (CFResources): All the resources being converted.
+        shard (Shard): The start and stop of the resources to convert.
+
+    Returns:
+        List[ResourceResult]: Each converted resource and its block changes.
+    """
+
+    start, stop = shard
+
+    results: List[ResourceResult] = []
+
+    for resource_id, resource_values in resources[start:stop]:
+        before = {
+            id(block): dict(block.arguments) for block in template.post_proccess_blocks
+        }
+
+        resource = template.convert_resource(resource_id, resource_values)
+
+        results.append((resource, block_changes(template.post_proccess_blocks, before)))
+
+    return results
+
+
+def merge_results(
+    template: "TemplateConverter", results: List[List[ResourceResult]]
+) -> List[Resource]:
+    tf_resources: List[Resource] = []
+
+    for shard_results in results:
+        for resource, changes in shard_results:
+            apply_block_changes(template.post_proccess_blocks, changes)
+            tf_resources.append(resource)
+
+    return tf_resources
+
+
+def make_shards(total: int, count: int) -> List[Shard]:
+    """Splits a number of items into at most count contiguous shards.
+
+    Args:
+        total (int): The number of items.
+        count (int): The largest number of shards to make.
+
+    Returns:
+        List[Shard]: The start and stop of each shard.
+    """
+
+    size = max(1, math.ceil(total / max(1, count)))
+
+    return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+
+def block_changes(
+    blocks: "BlockRegistry", before: Dict[int, Dict[str, Any]]
+) -> BlockChanges:
+    """Finds what changed in the post process blocks.
+
+    Args:
+        blocks (BlockRegistry): The post process blocks.
+        before (Dict[int, Dict[str, Any]]): The arguments of each block, by id,
+            from before the change.
+
+    Returns:
+        BlockChanges: The new blocks, in the order they were added, and the
+        arguments of the existing blocks that were set to a different value.
+    """
+
+    # New blocks are inserted at the front, so the last one added comes first
+    added = [block for block in blocks if id(block) not in before]
+    added.reverse()
+
+    updated: List[Tuple[str, Dict[str, Any]]] = []
+
+    for block in blocks:
+        old_arguments = before.get(id(block))
+
+        if old_arguments is None:
+            continue
+
+        changed = {
+            name: value
+            for name, value in block.arguments.items()
+            # An argument set again to an equal value, like a new copy of the
+            # same reference, hasn't changed
+            if name not in old_arguments or old_arguments[name] != value
+        }
+
+        if changed:
+            updated.append((block.base_ref(), changed))
+
+    return added, updated
+
+
+def apply_block_changes(blocks: "BlockRegistry", changes: BlockChanges):
+    """Makes the changes a worker found to the post process blocks.
+
+    Args:
+        blocks (BlockRegistry): The post process blocks.
+        changes (BlockChanges): The changes from `block_changes`.
+    """
+
+    added, updated = changes
+
+    for block in added:
+        # Another worker might have added the same block first
+        if not blocks.add(block):
+            existing = blocks.get(block.base_ref())
+
+            if existing is not None:
+                existing.arguments.update(block.arguments)
+
+    for base_ref, arguments in updated:
+        existing = blocks.get(base_ref)
+
+        if existing is not None:
+            existing.arguments.update(arguments)
+
+
+def init_worker():
+    """Prepares a forked worker process to convert resources or templates."""
+
+    # The SQLite connection can't be shared with the parent, so open a new one
+    cache = match_cache.active_cache()
+
+    if cache is not None:
+        match_cache.use_cache(match_cache.open_cache(cache.commit))
+
+
+def flush_worker():
+    """Saves the new matches of a worker, since workers exit without running atexit."""
+
+    cache = match_cache.active_cache()
+
+    if cache is not None:
+        cache.flush()
+
+
+def _convert_shard(shard: Shard) -> List[ResourceResult]:
+    if _work is None:
+        raise RuntimeError("The worker was not started by convert_resources.")
+
+    template, resources = _work
+
+    results = convert_range(template, resources, shard)
+
+    flush_worker()
+
+    return results
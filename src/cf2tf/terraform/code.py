@@ -1,20 +1,30 @@
 import logging
-import re
+import threading
 from pathlib import Path
 from shutil import rmtree
 from tempfile import gettempdir
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
 import click
 from click._termui_impl import ProgressBar
 from git import RemoteProgress
 from git.repo.base import InvalidGitRepositoryError, Repo
-from thefuzz import fuzz, process  # type: ignore
+from thefuzz import fuzz  # type: ignore
+
+import cf2tf.terraform.doc_file as doc_file
+import cf2tf.terraform.match_cache as match_cache
+from cf2tf.naming import resource_type_to_name, transform_file_name
+from cf2tf.terraform.doc_index import load_index
+from cf2tf.terraform.ngram import NgramIndex
 
 # import cf2tf.convert
 
 log = logging.getLogger("cf2tf")
 
+# A match inside of the service's own docs must score at least this high,
+# otherwise we search all of the docs.
+PARTITION_CUTOFF = 90
+
 
 class SearchManager:
     def __init__(self, docs_path: Path) -> None:
@@ -22,27 +32,95 @@ class SearchManager:
         self.resources = list(docs_path.joinpath("r").glob("*.markdown"))
         self.datas = list(docs_path.joinpath("d").glob("*.markdown"))
 
+        # The search names never change, so we only transform them once
+        self.choices = {
+            doc_file: transform_file_name(doc_file.name) for doc_file in self.resources
+        }
+
+        self.index = NgramIndex(self.choices, scorer=fuzz.ratio)
+
+        # Docs are also split up by the service prefix of the file name (rds, ec2...)
+        services: Dict[str, Dict[Path, str]] = {}
+
+        for doc_path, name in self.choices.items():
+            services.setdefault(doc_service(doc_path.name), {})[doc_path] = name
+
+        self.partitions = {
+            service: NgramIndex(choices, scorer=fuzz.ratio)
+            for service, choices in services.items()
+        }
+
+        self._found: Dict[str, Path] = {}
+        self.hits = 0
+        self.misses = 0
+
+        # The search manager can be shared by threads converting resources
+        self._lock = threading.RLock()
+
     def find(self, resource_type: str) -> Path:
+        with self._lock:
+            if resource_type in self._found:
+                self.hits += 1
+                return self._found[resource_type]
+
+            self.misses += 1
+
+        # The indexes are never changed, so threads can search them at the same time
         name = resource_type_to_name(resource_type)
 
+        log.debug(f"Converted CF type {resource_type} to search term {name}.")
         log.debug(f"Searcing for {name} in terraform docs...")
 
-        files = {
-            doc_file: transform_file_name(doc_file.name) for doc_file in self.resources
-        }
+        result = self._find_in_service(name)
+
+        if not result:
+            result = self.index.extract_one(name.lower())
 
         resource_name: str
         ranking: int
         doc_path: Path
-        resource_name, ranking, doc_path = process.extractOne(
-            name.lower(), files, scorer=fuzz.ratio
-        )
+        resource_name, ranking, doc_path = result
 
         log.debug(
             f"Best match was {resource_name} at {doc_path} with score of {ranking}."
         )
 
-        return doc_path
+        with self._lock:
+            log.debug(f"Search cache has {self.hits} hits and {self.misses} misses.")
+
+            # Another thread might have found the same type first
+            return self._found.setdefault(resource_type, doc_path)
+
+    def _find_in_service(self, name: str):
+        service = name_service(name)
+
+        partition = self.partitions.get(service)
+
+        if not partition:
+            return None
+
+        result = partition.extract_one(name.lower(), PARTITION_CUTOFF)
+
+        if not result:
+            log.debug(f"No confident match in {service} docs, searching all docs.")
+
+        return result
+
+    def find_all(self, resource_types: Iterable[str]) -> Dict[str, Path]:
+        """Finds the documentation for many resource types.
+
+        Each type is only searched for once, no matter how many times it's used.
+
+        Args:
+            resource_types (Iterable[str]): The Cloudformation resource types.
+
+        Returns:
+            Dict[str, Path]: The documentation file for each resource type.
+        """
+
+        wanted = dict.fromkeys(resource_types)
+
+        return {resource_type: self.find(resource_type) for resource_type in wanted}
 
 
 def search_manager():
@@ -55,6 +133,11 @@ def search_manager():
     if not docs_path.exists():
         print("The docs path does not exist")
 
+    commit = repo.head.commit.hexsha
+
+    doc_file.use_index(load_index(docs_path, commit))
+    match_cache.use_cache(match_cache.open_cache(commit))
+
     return SearchManager(docs_path)
 
 
@@ -97,31 +180,6 @@ def repo_from_existing(repo_path: Path) -> Optional[Repo]:
     return None
 
 
-def resource_type_to_name(resource_type: str) -> str:
-    """Converts a Cloudformation Resource Type into something more search friendly.
-
-    Args:
-        resource_type (str): The Cloudformation resource type.
-
-    Returns:
-        str: A search term that can be used to match resources in the TF docs.
-    """
-
-    search_tokens = resource_type.replace("::", " ").replace("AWS", " ").split(" ")
-
-    # I will leave the logic for camel case splitting here for now.
-    # in case we want to use it later.
-    # for i, token in enumerate(search_tokens):
-    #     if len(token) >= 4:
-    #         search_tokens[i] = cf2tf.convert.camel_case_split(token)
-
-    search_term = " ".join(search_tokens).lower().strip()
-
-    log.debug(f"Converted CF type {resource_type} to search term {search_term}.")
-
-    return search_term
-
-
 class CloneProgress(RemoteProgress):
     def __init__(self):
         super().__init__()
@@ -139,12 +197,27 @@ class CloneProgress(RemoteProgress):
         self.pbar = click.progressbar(length=max_count)
 
 
-def transform_file_name(og_name: str):
-    no_extensions = og_name.split(".")[0]
+def doc_service(file_name: str) -> str:
+    """Gets the service prefix of a doc file name, like `rds` for `rds_cluster`.
+
+    Args:
+        file_name (str): The name of the documentation file.
+
+    Returns:
+        str: The service prefix.
+    """
+
+    return file_name.split(".")[0].split("_")[0]
 
-    no_underscores = no_extensions.replace("_", " ")
 
-    # Sometimes file names have v2 in them.
-    split_numbers = re.split(r"(v\d)", no_underscores)
+def name_service(search_name: str) -> str:
+    """Gets the service from a search name, like `rds` for `rds dbcluster`.
+
+    Args:
+        search_name (str): A search name from `resource_type_to_name`.
+
+    Returns:
+        str: The service name.
+    """
 
-    return " ".join([item.strip() for item in split_numbers])
+    return search_name.split(" ")[0]
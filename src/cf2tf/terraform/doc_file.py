@@ -2,12 +2,35 @@ import logging
 import re
 from io import TextIOWrapper
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from cf2tf.terraform.doc_index import DocIndex
 
 log = logging.getLogger("cf2tf")
 
+# When set, documentation is read from the index instead of the markdown files
+_doc_index: Optional["DocIndex"] = None
+
+
+def use_index(index: Optional["DocIndex"]):
+    """Sets the documentation index used to answer lookups.
+
+    Args:
+        index (Optional[DocIndex]): The index to use or None to read the markdown files.
+    """
+    global _doc_index
+
+    _doc_index = index
+
 
 def parse_attributes(docs_path: Path):
+    if _doc_index is not None:
+        indexed_doc = _doc_index.get(docs_path)
+
+        if indexed_doc is not None:
+            return indexed_doc.parse_attributes(docs_path)
+
     with open(docs_path) as file:
         try:
             arguments = parse_section("Argument Reference", file)
@@ -23,6 +46,12 @@ def parse_attributes(docs_path: Path):
 
 
 def read_section(docs_path: Path, section_name: str):
+    if _doc_index is not None:
+        indexed_doc = _doc_index.get(docs_path)
+
+        if indexed_doc is not None:
+            return indexed_doc.read_section(docs_path, section_name)
+
     items: List[str]
     with open(docs_path) as file:
         items = parse_section(section_name, file)
@@ -110,6 +139,12 @@ def parse_items(file: TextIOWrapper):
 
 
 def all_sections(docs_path: Path):
+    if _doc_index is not None:
+        indexed_doc = _doc_index.get(docs_path)
+
+        if indexed_doc is not None:
+            return indexed_doc.all_sections()
+
     sections: List[str] = []
 
     with open(docs_path) as file:
@@ -0,0 +1,271 @@
+"""A persistent index of the Terraform provider documentation.
+
+Parsing the provider markdown is slow and the same files get read many times
+during a conversion. The index stores everything we read from a doc file and is
+saved to disk keyed by the commit of the provider checkout, so it only has to be
+built once per checkout.
+
+The saved index is a header line, with the offset of each doc, followed by the
+JSON of every doc. It is memory mapped and each doc is only decoded when it's
+used, so worker processes share one read-only copy of the index.
+"""
+
+import json
+import logging
+import mmap
+import os
+from pathlib import Path
+from tempfile import gettempdir
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+import cf2tf.terraform.doc_file as doc_file
+
+log = logging.getLogger("cf2tf")
+
+# Bump this when the format of the saved index changes
+INDEX_VERSION = 2
+
+
+class IndexedDoc:
+    """The parsed contents of a single documentation file."""
+
+    def __init__(
+        self,
+        headers: List[str],
+        items: List[List[str]],
+        arguments: Optional[List[str]],
+        attributes: Optional[List[str]],
+    ) -> None:
+        self.headers = headers
+        self.items = items
+        self.arguments = arguments
+        self.attributes = attributes
+
+    @classmethod
+    def from_file(cls, docs_path: Path) -> "IndexedDoc":
+        headers: List[str] = []
+        items: List[List[str]] = []
+
+        with open(docs_path) as file:
+            while True:
+                line = file.readline()
+
+                if not line:
+                    break
+
+                # parse_items stops at the next section, so each header owns
+                # the items directly below it.
+                if line.startswith("#"):
+                    headers.append(line.rstrip("\n"))
+                    items.append(doc_file.parse_items(file))
+
+        arguments: Optional[List[str]] = None
+        attributes: Optional[List[str]] = None
+
+        arg_pos = _find_header(headers, "Argument Reference", 0)
+
+        if arg_pos is not None:
+            arguments = items[arg_pos]
+
+            # The attributes are searched for after the arguments section
+            attr_pos = _find_header(headers, "Attribute Reference", arg_pos + 1)
+
+            if attr_pos is not None:
+                attributes = items[attr_pos]
+
+        return cls(headers, items, arguments, attributes)
+
+    def parse_attributes(self, docs_path: Union[str, Path]):
+        if self.arguments is None:
+            raise Exception(f"Unable to find arguments in {docs_path}")
+
+        if self.attributes is None:
+            raise Exception(f"Unable to find attributes in {docs_path}")
+
+        return (list(self.arguments), list(self.attributes))
+
+    def all_sections(self) -> List[str]:
+        return [header.strip() for header in self.headers if header.startswith("##")]
+
+    def read_section(self, docs_path: Union[str, Path], section_name: str):
+        pos = _find_header(self.headers, section_name, 0)
+
+        if pos is None:
+            raise Exception(f"Unable to find section {section_name} in {docs_path}")
+
+        return list(self.items[pos])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "headers": self.headers,
+            "items": self.items,
+            "arguments": self.arguments,
+            "attributes": self.attributes,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IndexedDoc":
+        return cls(
+            data["headers"], data["items"], data["arguments"], data["attributes"]
+        )
+
+
+class MappedDocs(Mapping[str, IndexedDoc]):
+    """The docs of a saved index, decoded from the memory mapped file when used."""
+
+    def __init__(
+        self, data: mmap.mmap, start: int, offsets: Dict[str, Tuple[int, int]]
+    ) -> None:
+        self.data = data
+        self.start = start
+        self.offsets = offsets
+        self._decoded: Dict[str, IndexedDoc] = {}
+
+    def __getitem__(self, name: str) -> IndexedDoc:
+        doc = self._decoded.get(name)
+
+        if doc is None:
+            offset, length = self.offsets[name]
+            begin = self.start + offset
+
+            doc = IndexedDoc.from_dict(json.loads(self.data[begin : begin + length]))
+            self._decoded[name] = doc
+
+        return doc
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+
+class DocIndex:
+    """All the indexed documentation files for one provider checkout."""
+
+    def __init__(
+        self, docs_path: Path, commit: str, docs: Mapping[str, IndexedDoc]
+    ) -> None:
+        self.docs_path = docs_path
+        self.commit = commit
+        self.docs = docs
+
+        # Lookups come in as absolute paths, so map those back to the doc name
+        self._paths = {str(docs_path.joinpath(name)): name for name in docs}
+
+    @classmethod
+    def build(cls, docs_path: Path, commit: str) -> "DocIndex":
+        log.info(f"// Building documentation index for commit {commit}...")
+
+        docs: Dict[str, IndexedDoc] = {}
+
+        for doc_path in sorted(docs_path.joinpath("r").glob("*.markdown")):
+            name = doc_path.relative_to(docs_path).as_posix()
+            docs[name] = IndexedDoc.from_file(doc_path)
+
+        return cls(docs_path, commit, docs)
+
+    @classmethod
+    def load(cls, index_path: Path, docs_path: Path) -> "DocIndex":
+        with open(index_path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header_end = data.find(b"\n")
+
+        if header_end < 0:
+            raise ValueError("The index header is missing.")
+
+        header = json.loads(data[:header_end])
+
+        if header.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version {header.get('version')}.")
+
+        offsets = {
+            name: (offset, length) for name, (offset, length) in header["docs"].items()
+        }
+
+        docs = MappedDocs(data, header_end + 1, offsets)
+
+        return cls(docs_path, header["commit"], docs)
+
+    def save(self, index_path: Path):
+        blobs: List[bytes] = []
+        offsets: Dict[str, Tuple[int, int]] = {}
+        offset = 0
+
+        for name, doc in self.docs.items():
+            blob = json.dumps(doc.to_dict()).encode("utf-8")
+            offsets[name] = (offset, len(blob))
+            blobs.append(blob)
+            offset += len(blob)
+
+        header = {"version": INDEX_VERSION, "commit": self.commit, "docs": offsets}
+
+        # Write to a temporary file first so a reader never sees a partial index
+        tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8"))
+            f.write(b"\n")
+            f.writelines(blobs)
+
+        os.replace(tmp_path, index_path)
+
+    def get(self, docs_path: Union[str, Path]) -> Optional[IndexedDoc]:
+        name = self._paths.get(str(docs_path))
+
+        if name is None:
+            return None
+
+        return self.docs[name]
+
+
+def index_path(commit: str) -> Path:
+    return Path(gettempdir()).joinpath(
+        f"cf2tf_doc_index_v{INDEX_VERSION}_{commit}.index"
+    )
+
+
+def load_index(docs_path: Path, commit: str) -> DocIndex:
+    """Loads the documentation index for a commit, building it if needed.
+
+    Args:
+        docs_path (Path): The docs folder of the provider checkout.
+        commit (str): The commit sha of the provider checkout.
+
+    Returns:
+        DocIndex: The index for the provider docs.
+    """
+
+    path = index_path(commit)
+
+    if path.exists():
+        try:
+            index = DocIndex.load(path, docs_path)
+            log.debug(f"Loaded documentation index from {path}")
+            return index
+        except Exception as e:
+            log.debug(f"Rebuilding documentation index {path} because {e}")
+
+    index = DocIndex.build(docs_path, commit)
+
+    try:
+        index.save(path)
+    except OSError as e:
+        log.debug(f"Unable to save documentation index to {path} because {e}")
+        return index
+
+    # The mapped copy is shared with worker processes instead of each having its own
+    try:
+        return DocIndex.load(path, docs_path)
+    except Exception as e:
+        log.debug(f"Using the documentation index in memory because {e}")
+        return index
+
+
+def _find_header(headers: List[str], name: str, start: int) -> Optional[int]:
+    for pos in range(start, len(headers)):
+        if name in headers[pos]:
+            return pos
+
+    return None
@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, List, Union
+from typing import Any, Dict, Iterator, List, Tuple, Union
 
 from cf2tf.terraform.hcl2.primitive import PrimitiveTypes, TerraformType
 
@@ -44,37 +44,66 @@ ComplexTypes = Union[ListType, MapType]
 
 
 def render_tf_list(items: List[TerraformType], indent=0):
-    rear_brace = " " * indent
+    return _render(items, indent)
 
-    indent += 2
 
-    spacing = " " * indent
+def render_tf_map(items: Dict[PrimitiveTypes, TerraformType], indent=0):
+    return _render(items, indent)
 
-    result = "[\n"
 
-    for item in items:
-        comma = "" if item is items[-1] else ","
+class _Frame:
+    """A list or map that is being rendered, with the items still to render."""
 
-        result += f"{spacing}{item.render(indent)}{comma}\n"
+    __slots__ = ("entries", "indent", "is_list", "last", "suffix")
 
-    result += f"{rear_brace}]"
+    def __init__(self, items: Union[list, dict], indent: int, suffix: str) -> None:
+        self.is_list = isinstance(items, list)
+        self.entries: Iterator[Tuple[Any, Any]] = iter(
+            enumerate(items) if isinstance(items, list) else items.items()
+        )
+        self.indent = indent
+        self.last = len(items) - 1
+        self.suffix = suffix
 
-    return result
 
+def _render(items: Union[list, dict], indent: int) -> str:
+    # Nested lists and maps are rendered with a stack instead of recursion, so
+    # deeply nested values don't hit the recursion limit.
+    parts: List[str] = []
 
-def render_tf_map(items: Dict[PrimitiveTypes, TerraformType], indent=0):
-    rear_brace = " " * indent
+    stack = [_Frame(items, indent, "")]
+    parts.append("[\n" if stack[0].is_list else "{")
+
+    while stack:
+        frame = stack[-1]
+        spacing = " " * (frame.indent + 2)
+
+        entry = next(frame.entries, None)
 
-    indent += 2
+        if entry is None:
+            stack.pop()
+            rear_brace = " " * frame.indent
+            parts.append(f"{rear_brace}]" if frame.is_list else f"\n{rear_brace}}}")
+            parts.append(frame.suffix)
+            continue
 
-    spacing = " " * indent
+        key, value = entry
 
-    result = "{"
+        if frame.is_list:
+            # The same value can be in a list more than once, like a cached reference
+            parts.append(spacing)
+            suffix = ("" if key == frame.last else ",") + "\n"
+        else:
+            parts.append(f"\n{spacing}{key} = ")
+            suffix = ""
 
-    for name, value in items.items():
-        # if isinstance(value, ListType):
-        #     result += f"\n{spacing}{name} = {value.render(indent)}"
+        if isinstance(value, (ListType, MapType)):
+            child = _Frame(value, frame.indent + 2, suffix)
+            parts.append("[\n" if child.is_list else "{")
+            stack.append(child)
+            continue
 
-        result = result + f"\n{spacing}{name} = {value.render(indent)}"
+        parts.append(f"{value.render(frame.indent + 2)}")
+        parts.append(suffix)
 
-    return result + f"\n{rear_brace}}}"
+    return "".join(parts)
@@ -1,14 +1,24 @@
 from typing import Union
 
+import cf2tf.interning as interning
+
 from cf2tf.terraform.hcl2.primitive import TerraformType
 
 
 class LiteralType(str, TerraformType):
     """A literal value like the result of a terraform expression."""
 
-    def __init__(self, value: str) -> None:
-        super().__init__()
-        self.value = value
+    value: str
+
+    def __new__(cls, value: str) -> "LiteralType":
+        # Equal literals share one instance, like the references to a resource
+        return interning.intern_value(cls, value)
+
+    def __copy__(self) -> "LiteralType":
+        return self
+
+    def __deepcopy__(self, memo) -> "LiteralType":
+        return self
 
     def __str__(self) -> str:
         return self.render()
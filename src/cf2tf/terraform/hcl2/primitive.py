@@ -10,6 +10,8 @@ except ImportError:
 
 import logging
 
+import cf2tf.interning as interning
+
 log = logging.getLogger("cf2tf")
 
 
@@ -30,15 +32,21 @@ class TerraformType(Protocol):
 class StringType(str, TerraformType):
     """A sequence of Unicode characters representing some text, like "hello"."""
 
-    def __init__(self, value: str) -> None:
-        """Default constructor
+    value: str
+
+    def __new__(cls, value: str) -> "StringType":
+        """Default constructor, equal strings share one instance.
 
         Args:
             value (str): The value for this Terraform type.
         """
-        super().__init__()
+        return interning.intern_value(cls, value)
 
-        self.value = value
+    def __copy__(self) -> "StringType":
+        return self
+
+    def __deepcopy__(self, memo) -> "StringType":
+        return self
 
     def __str__(self) -> str:
         return self.render()
@@ -0,0 +1,321 @@
+"""A SQLite cache of fuzzy matching decisions.
+
+The same Cloudformation names are fuzzy matched against the same Terraform docs
+run after run. The cache stores each decision keyed by the commit of the provider
+checkout, so warm runs can skip the fuzzy matching. The matches made by another
+`VERSION` of the matcher are dropped when the cache is opened.
+
+The cache is only an optimization. If the file can't be read or written, like a
+locked or read-only file in a shared temp dir, the cache is disabled for the rest
+of the run and the names are fuzzy matched as usual.
+"""
+
+import atexit
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+from tempfile import gettempdir
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import sqlite3
+except ImportError:
+    # Some python builds do not include sqlite, the cache is just disabled
+    sqlite3 = None  # type: ignore
+
+log = logging.getLogger("cf2tf")
+
+Match = Optional[Tuple[str, int]]
+
+CacheKey = Tuple[str, str, int]
+
+# The cache is trimmed back to this many matches when it gets too big
+MAX_ENTRIES = 200_000
+
+# Pending matches are written to disk in batches of this size
+BATCH_SIZE = 500
+
+# Change this when the fuzzy matching or the schema changes, the cached matches
+# of any other version are dropped
+VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    commit_sha TEXT NOT NULL,
+    items TEXT NOT NULL,
+    term TEXT NOT NULL,
+    cutoff INTEGER NOT NULL,
+    match TEXT,
+    score INTEGER,
+    created REAL NOT NULL,
+    PRIMARY KEY (commit_sha, items, term, cutoff)
+)
+"""
+
+# When set, fuzzy matches are looked up in this cache first
+_match_cache: Optional["MatchCache"] = None
+
+
+class MatchCache:
+    """Fuzzy matching decisions for one provider checkout."""
+
+    def __init__(self, path: Path, commit: str, max_entries=MAX_ENTRIES) -> None:
+        self.path = path
+        self.commit = commit
+        self.max_entries = max_entries
+
+        # Threads share the connection, the lock makes sure only one uses it at a time
+        self.connection = sqlite3.connect(
+            str(path), timeout=30, check_same_thread=False
+        )
+        self._lock = threading.RLock()
+
+        try:
+            self._check_version()
+
+            self.connection.execute(SCHEMA)
+            self.connection.commit()
+        except sqlite3.Error:
+            self.connection.close()
+            raise
+
+        self._memory: Dict[CacheKey, Match] = {}
+        self._pending: List[Tuple] = []
+
+        # Set when the file can't be used, the matches are only kept in memory
+        self.disabled = False
+
+        self.hits = 0
+        self.misses = 0
+
+    def _check_version(self):
+        (version,) = self.connection.execute("PRAGMA user_version").fetchone()
+
+        if version == VERSION:
+            return
+
+        log.debug(f"Dropping the match cache of version {version}, now {VERSION}")
+
+        with self.connection:
+            self.connection.execute("DROP TABLE IF EXISTS matches")
+            self.connection.execute(f"PRAGMA user_version = {VERSION}")
+
+    def get(self, search_term: str, items: str, cutoff: int) -> Tuple[bool, Match]:
+        """Looks up a fuzzy match.
+
+        Args:
+            search_term (str): The term that was searched for.
+            items (str): The digest of the items that were searched.
+            cutoff (int): The score cutoff of the search.
+
+        Returns:
+            Tuple[bool, Match]: If the match was found and the match itself.
+        """
+
+        key = (search_term, items, cutoff)
+
+        with self._lock:
+            if key in self._memory:
+                self.hits += 1
+                return True, self._memory[key]
+
+            row = None
+
+            if not self.disabled:
+                try:
+                    row = self.connection.execute(
+                        "SELECT match, score FROM matches"
+                        " WHERE commit_sha = ? AND items = ? AND term = ? AND cutoff = ?",
+                        (self.commit, items, search_term, cutoff),
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    self._disable(e)
+
+            if row is None:
+                self.misses += 1
+                return False, None
+
+            self.hits += 1
+
+            match: Match = None if row[0] is None else (row[0], row[1])
+
+            self._memory[key] = match
+
+            return True, match
+
+    def put(self, search_term: str, items: str, cutoff: int, match: Match):
+        name, score = match if match else (None, None)
+
+        with self._lock:
+            self._memory[(search_term, items, cutoff)] = match
+
+            if self.disabled:
+                return
+
+            self._pending.append(
+                (self.commit, items, search_term, cutoff, name, score, time.time())
+            )
+
+            if len(self._pending) >= BATCH_SIZE:
+                self.flush()
+
+    def flush(self):
+        """Writes the pending matches to disk and enforces the size limit."""
+
+        with self._lock:
+            if not self._pending or self.disabled:
+                return
+
+            try:
+                with self.connection:
+                    self.connection.executemany(
+                        "INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        self._pending,
+                    )
+
+                self._pending = []
+
+                self.trim(self.max_entries)
+            except sqlite3.Error as e:
+                self._disable(e)
+
+    def _disable(self, error: Exception):
+        log.debug(f"Not using the match cache {self.path} any more because {error}")
+
+        self.disabled = True
+        self._pending = []
+
+    def trim(self, max_entries: int) -> int:
+        """Removes the oldest matches until there are at most max_entries.
+
+        Args:
+            max_entries (int): The number of matches to keep.
+
+        Returns:
+            int: The number of matches removed.
+        """
+
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM matches").fetchone()
+
+        extra = count - max_entries
+
+        if extra <= 0:
+            return 0
+
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM matches WHERE rowid IN"
+                " (SELECT rowid FROM matches ORDER BY created ASC LIMIT ?)",
+                (extra,),
+            )
+
+        return extra
+
+    def prune(self, max_entries: Optional[int] = None) -> int:
+        """Removes the matches of older provider checkouts and trims the cache.
+
+        Args:
+            max_entries (Optional[int]): The number of matches to keep.
+
+        Returns:
+            int: The number of matches removed.
+        """
+
+        self.flush()
+
+        with self.connection:
+            removed = self.connection.execute(
+                "DELETE FROM matches WHERE commit_sha !="
+                " (SELECT commit_sha FROM matches ORDER BY created DESC LIMIT 1)"
+            ).rowcount
+
+        removed += self.trim(self.max_entries if max_entries is None else max_entries)
+
+        self.connection.execute("VACUUM")
+
+        return removed
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self.connection.close()
+
+
+def cache_path() -> Path:
+    return Path(gettempdir()).joinpath("cf2tf_match_cache.sqlite3")
+
+
+def open_cache(commit: str) -> Optional[MatchCache]:
+    if sqlite3 is None:
+        return None
+
+    path = cache_path()
+
+    try:
+        cache = MatchCache(path, commit)
+    except sqlite3.Error as e:
+        log.debug(f"Unable to open the match cache {path} because {e}")
+        return None
+
+    # Make sure the last batch of matches is saved
+    atexit.register(cache.close)
+
+    return cache
+
+
+def prune_cache(max_entries: Optional[int] = None) -> Optional[int]:
+    """Removes the matches of older provider checkouts from the cache on disk.
+
+    Args:
+        max_entries (Optional[int]): The number of matches to keep.
+
+    Returns:
+        Optional[int]: The number of matches removed or None if sqlite is not
+        available or the cache file can't be used.
+    """
+
+    if sqlite3 is None:
+        return None
+
+    path = cache_path()
+    cache: Optional[MatchCache] = None
+
+    try:
+        cache = MatchCache(path, "")
+        return cache.prune(max_entries)
+    except sqlite3.Error as e:
+        log.debug(f"Unable to prune the match cache {path} because {e}")
+        return None
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def use_cache(cache: Optional[MatchCache]):
+    """Sets the cache used for fuzzy matches.
+
+    Args:
+        cache (Optional[MatchCache]): The cache to use or None to disable caching.
+    """
+    global _match_cache
+
+    _match_cache = cache
+
+
+def active_cache() -> Optional[MatchCache]:
+    return _match_cache
+
+
+def items_digest(search_items: Sequence[str]) -> str:
+    """A short digest that identifies a list of search items.
+
+    Args:
+        search_items (Sequence[str]): The items that are being searched.
+
+    Returns:
+        str: The digest of the items.
+    """
+
+    return hashlib.sha1("\0".join(search_items).encode("utf-8")).hexdigest()
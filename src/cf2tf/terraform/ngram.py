@@ -0,0 +1,173 @@
+"""An n-gram index used to speed up fuzzy searches.
+
+Fuzzy matching scores the search term against every possible choice. The index
+finds a small shortlist of choices that share the most trigrams with the search
+term and scores those first. The best score from the shortlist is then used as
+the cutoff for the full search, which lets the scorer skip most choices without
+fully scoring them. The result is always the same as `thefuzz.process.extractOne`.
+"""
+
+import logging
+from collections import defaultdict
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from rapidfuzz import fuzz as rfuzz
+from rapidfuzz import process as rprocess
+from thefuzz import fuzz, utils  # type: ignore
+
+log = logging.getLogger("cf2tf")
+
+Choices = Union[Sequence[str], Mapping[Any, str]]
+
+# The rapidfuzz scorer and the processor thefuzz uses for each of its scorers
+SCORERS: Dict[Callable[..., int], Tuple[Callable[..., float], Callable[[str], str]]] = {
+    fuzz.ratio: (rfuzz.ratio, utils.full_process),
+    fuzz.WRatio: (rfuzz.WRatio, partial(utils.full_process, force_ascii=True)),
+}
+
+
+class NgramIndex:
+    """A trigram inverted index over a list or mapping of choices."""
+
+    def __init__(
+        self,
+        choices: Choices,
+        scorer: Callable[..., int] = fuzz.WRatio,
+        shortlist_size: int = 10,
+    ) -> None:
+        if scorer not in SCORERS:
+            raise ValueError(f"Scorer {scorer.__name__} is not supported.")
+
+        self.is_mapping = isinstance(choices, Mapping)
+        self.keys: List[Any] = (
+            list(choices.keys()) if isinstance(choices, Mapping) else []
+        )
+        self.values: List[str] = (
+            list(choices.values()) if isinstance(choices, Mapping) else list(choices)
+        )
+        self.scorer, self.processor = SCORERS[scorer]
+        self.shortlist_size = shortlist_size
+
+        # thefuzz processes every choice on each search, we only do it once
+        self.processed = [self.processor(value) for value in self.values]
+
+        # Only equal strings score 100, so exact matches can skip the search
+        self.exact: Dict[str, int] = {}
+
+        for pos, value in reversed(list(enumerate(self.processed))):
+            if value:
+                self.exact[value] = pos
+
+        self.grams: Dict[str, Set[int]] = defaultdict(set)
+
+        for pos, value in enumerate(self.processed):
+            for gram in trigrams(value):
+                self.grams[gram].add(pos)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def shortlist(self, search_term: str) -> List[int]:
+        """Finds the choices that share the most trigrams with the search term.
+
+        Args:
+            search_term (str): The processed term being searched for.
+
+        Returns:
+            List[int]: The position of each shortlisted choice.
+        """
+
+        counts: Dict[int, int] = defaultdict(int)
+
+        for gram in trigrams(search_term):
+            for pos in self.grams.get(gram, ()):
+                counts[pos] += 1
+
+        return sorted(counts, key=lambda pos: (-counts[pos], pos))[
+            : self.shortlist_size
+        ]
+
+    def process(self, search_term: str) -> str:
+        # thefuzz processes the search term with its default processor first
+        return self.processor(utils.full_process(search_term))
+
+    def exact_match(self, search_term: str) -> Optional[Tuple]:
+        """Finds a choice that is the same as the search term once processed.
+
+        Args:
+            search_term (str): The term being searched for.
+
+        Returns:
+            Optional[Tuple]: The same result as `extract_one` or None if there
+            is no exact match.
+        """
+
+        pos = self.exact.get(self.process(search_term))
+
+        if pos is None:
+            return None
+
+        return self._result(pos, 100)
+
+    def extract_one(self, search_term: str, score_cutoff=0) -> Optional[Tuple]:
+        """The same as `thefuzz.process.extractOne` but faster for large choices.
+
+        Args:
+            search_term (str): The term being searched for.
+            score_cutoff (int, optional): The lowest score to accept. Defaults to 0.
+
+        Returns:
+            Optional[Tuple]: The match, score and key if choices is a mapping.
+        """
+
+        query = self.process(search_term)
+
+        pos = self.exact.get(query)
+
+        if pos is not None:
+            return self._result(pos, 100)
+
+        best = 0.0
+
+        for pos in self.shortlist(query):
+            best = max(best, self.scorer(query, self.processed[pos]))
+
+        # The cutoff is never higher than the best score, so the full search
+        # still finds the same (first) best match, it just gets to skip more.
+        # A little is taken off the best score to allow for float rounding.
+        cutoff = max(score_cutoff, best - 0.01)
+
+        result = rprocess.extractOne(
+            query, self.processed, scorer=self.scorer, score_cutoff=cutoff
+        )
+
+        if result is None:
+            return None
+
+        _, score, pos = result
+
+        return self._result(pos, score)
+
+    def _result(self, pos: int, score: float) -> Tuple:
+        if self.is_mapping:
+            return (self.values[pos], int(round(score)), self.keys[pos])
+
+        return (self.values[pos], int(round(score)))
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+
+    return {padded[pos : pos + 3] for pos in range(len(padded) - 2)}
@@ -1,5 +1,6 @@
 from click.testing import CliRunner
 from cf2tf.app import cli
+import cf2tf.terraform.match_cache as match_cache
 
 
 def test_cli():
@@ -8,3 +9,24 @@ def test_cli():
     print(result.output)
     assert result.exit_code == 0
     assert "0.0.0" in result.output
+
+
+def test_cli_prune_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(match_cache, "cache_path", lambda: tmp_path / "cache.sqlite3")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--prune-cache"])
+    assert result.exit_code == 0
+    assert "Removed 0 cached matches" in result.output
+
+
+def test_cli_threads_batch(tmp_path):
+    templates = [tmp_path / "first.yaml", tmp_path / "second.yaml"]
+
+    for template in templates:
+        template.write_text("Resources: {}\n")
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--threads", *map(str, templates)])
+    assert result.exit_code == 2
+    assert "--threads can only be used with a single template" in result.output
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import pytest
+
+from cf2tf import batch
+from cf2tf.cloudformation import Template
+from cf2tf.convert import TemplateConverter
+from cf2tf.terraform import code
+
+templates = Path("tests/data/templates")
+
+batch_templates = [templates / "iam.yaml", templates / "log_bucket.yaml"]
+
+
+def convert_single(template_path: Path):
+    cf_template = Template.from_yaml(template_path).template
+
+    config = TemplateConverter(template_path.stem, cf_template, code.search_manager())
+
+    return [str(block) for block in config.convert().resources]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_convert_batch(jobs: int, tmp_path: Path):
+    batch.convert_batch(batch_templates, str(tmp_path), jobs)
+
+    for template_path in batch_templates:
+        output_dir = tmp_path / template_path.stem
+
+        saved = "".join(path.read_text() for path in sorted(output_dir.iterdir()))
+
+        for block in convert_single(template_path):
+            assert block in saved
+
+
+def test_convert_batch_same_names(tmp_path: Path):
+    with pytest.raises(ValueError, match="different file names"):
+        batch.convert_batch(
+            [templates / "iam.yaml", Path("other/iam.yaml")], str(tmp_path)
+        )
+
+
+def test_convert_template_needs_batch():
+    with pytest.raises(RuntimeError):
+        batch.convert_template(templates / "iam.yaml")
@@ -0,0 +1,86 @@
+import datetime
+from pathlib import Path
+
+import pytest
+import yaml  # type: ignore
+
+from cf2tf.cloudformation import Template
+from cf2tf.cloudformation._loader import load
+
+short_form_tests = [
+    # (source, expected)
+    ("!Ref Bucket", {"Ref": "Bucket"}),
+    ("!Ref 123", {"Ref": "123"}),
+    ("!Condition IsProd", {"Condition": "IsProd"}),
+    ("!GetAtt Db.Endpoint.Address", {"Fn::GetAtt": ["Db", "Endpoint.Address"]}),
+    ("!GetAtt [Bucket, Arn]", {"Fn::GetAtt": ["Bucket", "Arn"]}),
+    (
+        "!Select [0, !GetAZs '']",
+        {"Fn::Select": [0, {"Fn::GetAZs": ""}]},
+    ),
+    (
+        "!If [IsProd, !Ref AWS::NoValue, {z: 1, a: 2}]",
+        {"Fn::If": ["IsProd", {"Ref": "AWS::NoValue"}, {"z": 1, "a": 2}]},
+    ),
+    (
+        "!Transform {Name: 'AWS::Include', Alpha: 1}",
+        {"Fn::Transform": {"Alpha": 1, "Name": "AWS::Include"}},
+    ),
+]
+
+
+@pytest.mark.parametrize("source, expected", short_form_tests)
+def test_load_short_form(source: str, expected):
+    assert load(source) == expected
+
+
+def test_load_transform_keys_are_sorted():
+    result = load("!Transform {Name: 'AWS::Include', Alpha: 1}")
+
+    assert list(result["Fn::Transform"]) == ["Alpha", "Name"]
+
+
+def test_load_types():
+    result = load(
+        "AWSTemplateFormatVersion: 2010-09-09\n"
+        "Account: '0123456789'\n"
+        "Enabled: yes\n"
+        "Port: 0x1f\n"
+        "Size: 1e3\n"
+    )
+
+    assert result == {
+        "AWSTemplateFormatVersion": datetime.date(2010, 9, 9),
+        "Account": "0123456789",
+        "Enabled": True,
+        "Port": 31,
+        "Size": "1e3",
+    }
+
+
+def test_load_is_safe():
+    with pytest.raises(yaml.YAMLError):
+        load("!!python/object/apply:os.system ['true']")
+
+
+def test_from_yaml(tmp_path: Path):
+    template_path = tmp_path.joinpath("template.yaml")
+    template_path.write_text(
+        "Resources:\n"
+        "  Bucket:\n"
+        "    Type: AWS::S3::Bucket\n"
+        "    Properties:\n"
+        "      BucketName: !Sub '${AWS::StackName}-logs'\n"
+    )
+
+    template = Template.from_yaml(template_path)
+
+    assert template.template == {
+        "Resources": {
+            "Bucket": {
+                "Type": "AWS::S3::Bucket",
+                "Properties": {"BucketName": {"Fn::Sub": "${AWS::StackName}-logs"}},
+            }
+        }
+    }
+    assert yaml.safe_load(template.raw) == template.template
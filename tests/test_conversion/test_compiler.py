@@ -0,0 +1,188 @@
+from typing import Any, Dict, Hashable
+
+import pytest
+
+import cf2tf.terraform.code as code
+from cf2tf.conversion import compiler, expressions, ir
+from cf2tf.convert import TemplateConverter
+from cf2tf.terraform.blocks import Locals
+from cf2tf.terraform.hcl2.custom import CommentType
+
+
+@pytest.fixture(scope="module")
+def tc() -> TemplateConverter:
+    cf_template: Dict[str, Any] = {
+        "Conditions": {"IsProd": {"Fn::Equals": ["a", "b"]}},
+        "Resources": {"Bucket": {"Type": "AWS::S3::Bucket"}},
+    }
+
+    template = TemplateConverter("test", cf_template, code.search_manager())
+    template.parse_template()
+
+    return template
+
+
+def test_compile_value():
+    value = {
+        "Name": {"Fn::Join": ["-", [{"Ref": "Bucket"}, "logs"]]},
+        "Enabled": {"Fn::If": ["IsProd", True, False]},
+        "Items": [1, {"Condition": "IsProd"}],
+    }
+
+    root = compiler.compile_value(value, expressions.ALL_FUNCTIONS)
+
+    assert isinstance(root, compiler.Map)
+    assert root.names == ("Name", "Enabled", "Items")
+
+    join, if_, items = root.children
+
+    assert isinstance(join, compiler.Join)
+    assert join.name == "Fn::Join"
+    assert join.delimiter == "-"
+
+    assert isinstance(if_, compiler.If)
+    assert if_.condition == "IsProd"
+
+    assert isinstance(items, compiler.Sequence)
+    assert isinstance(items.children[0], compiler.Scalar)
+    assert isinstance(items.children[1], compiler.Condition)
+
+    (parts,) = join.children
+
+    assert isinstance(parts.children[0], compiler.Ref)
+
+
+def test_compile_value_not_allowed(tc: TemplateConverter):
+    value = {
+        "Zones": {"Fn::GetAZs": ""},
+        "Name": {"Fn::Sub": {"Fn::Equals": ["a", "b"]}},
+    }
+
+    blocks = len(tc.post_proccess_blocks)
+
+    with pytest.raises(ValueError, match="Fn::Equals not allowed to be nested"):
+        tc.resolve_values(value, expressions.ALL_FUNCTIONS)
+
+    # The nesting is checked before anything is converted
+    assert len(tc.post_proccess_blocks) == blocks
+
+
+def test_compile_value_bad_argument():
+    value = {"Fn::Join": ["-", "a", "b"]}
+
+    root = compiler.compile_value(value, expressions.ALL_FUNCTIONS)
+
+    # The argument is still compiled, for the comment that replaces the function
+    assert isinstance(root, compiler.Unresolved)
+    assert isinstance(root.error, ValueError)
+    assert isinstance(root.children[0], compiler.Sequence)
+
+
+def test_compile_value_keeps_resource_condition():
+    value = {"Condition": "IsProd", "Properties": {"Name": "a"}}
+
+    root = compiler.compile_value(value, expressions.ALL_FUNCTIONS)
+
+    assert isinstance(root, compiler.Map)
+    assert isinstance(root.children[0], compiler.Raw)
+
+
+def test_compile_value_unknown_scalar():
+    with pytest.raises(Exception, match="Unknown value"):
+        compiler.compile_value([object()], {})
+
+
+def test_lower(tc: TemplateConverter):
+    value = {
+        "Name": {"Fn::Join": ["-", [{"Ref": "Bucket"}, "logs"]]},
+        "Enabled": {"Fn::If": ["IsProd", True, False]},
+        "Bad": {"Fn::Select": ["a", "b"]},
+        "Parts": {"Fn::Split": ["/", {"Fn::Sub": ["${A}/b", {"A": "a"}]}]},
+        "Missing": {"Fn::GetAtt": ["Missing", "Arn"]},
+    }
+
+    result = compiler.lower(
+        tc, compiler.compile_value(value, expressions.ALL_FUNCTIONS)
+    )
+
+    assert result["Name"] == 'join("-", [aws_s3_bucket.bucket.id, "logs"])'
+    assert result["Enabled"] == "local.IsProd ? true : false"
+    assert isinstance(result["Bad"], CommentType)
+
+    # The delimiter is quoted once
+    assert result["Parts"] == 'split("/", "${"a"}/b")'
+    assert result["Missing"] == (
+        "Unable to resolve Fn::GetAtt with value: "
+        '[\n  "Missing",\n  "Arn"\n] because '
+        "'Fn::GetAtt - Resource Missing not found in template.'"
+    )
+
+    # Lowering the same value again makes a new map, but the strings are shared
+    again = compiler.lower(tc, compiler.compile_value(value, expressions.ALL_FUNCTIONS))
+
+    assert again == result
+    assert again is not result
+    assert again["Enabled"] is result["Enabled"]
+
+
+def test_compile_value_shares_subtrees():
+    tags = [{"Key": "Team", "Value": {"Fn::Sub": "${AWS::StackName}-team"}}]
+
+    frozen: Dict[int, Any] = {}
+    value = ir.freeze({"First": {"Tags": tags}, "Second": {"Tags": tags}}, frozen)
+
+    assert value["First"] is value["Second"]
+
+    cache: Dict[Hashable, compiler.Node] = {}
+
+    root = compiler.compile_value(
+        value, expressions.ALL_FUNCTIONS, cache=cache, frozen=frozen
+    )
+
+    first, second = root.children
+
+    assert first is second
+    assert first.key is not None
+    assert cache[first.key] is first
+
+    # The root is never shared
+    assert root.key is None
+
+
+def test_compile_value_only_shares_own_subtrees():
+    value = ir.freeze({"First": {"Tags": ["a"]}, "Second": {"Tags": ["a"]}})
+
+    cache: Dict[Hashable, compiler.Node] = {}
+
+    # Without the table it was frozen with, a node_id could be any subtree
+    root = compiler.compile_value(
+        value, expressions.ALL_FUNCTIONS, cache=cache, frozen={}
+    )
+
+    first, second = root.children
+
+    assert first is not second
+    assert first.key is None
+    assert not [key for key in cache if not isinstance(key[0], type)]
+
+
+def test_lower_shares_results(tc: TemplateConverter):
+    tags = [{"Key": "Team", "Value": {"Fn::Join": ["-", ["a", "b"]]}}]
+
+    frozen: Dict[int, Any] = {}
+    value = ir.freeze({"First": {"Tags": tags}, "Second": {"Tags": tags}}, frozen)
+
+    cache: Dict[Hashable, compiler.Node] = {}
+
+    root = compiler.compile_value(
+        value, expressions.ALL_FUNCTIONS, cache=cache, frozen=frozen
+    )
+    result = compiler.lower(tc, root)
+
+    assert result["First"] is result["Second"]
+    assert tc.post_proccess_blocks.lowered[root.children[0].key] is result["First"]
+
+    # A new block could change the result, so the lowered values are forgotten
+    tc.add_post_block(Locals({}))
+
+    assert not tc.post_proccess_blocks.lowered
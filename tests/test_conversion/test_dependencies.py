@@ -0,0 +1,99 @@
+from typing import Any, Set
+
+import pytest
+
+from cf2tf.conversion import dependencies
+from cf2tf.conversion.dependencies import DependencyGraph
+
+find_references_tests = [
+    # (value, expected_references)
+    ({"Ref": "Bucket"}, {"Bucket"}),
+    ({"Fn::GetAtt": ["Bucket", "Arn"]}, {"Bucket"}),
+    ({"Fn::GetAtt": "Bucket.Arn"}, {"Bucket"}),
+    (
+        {"Fn::Sub": "arn:${AWS::Partition}:s3:::${Bucket}/${!Literal}"},
+        {"AWS::Partition", "Bucket"},
+    ),
+    ({"Fn::Sub": "${Queue.Arn}"}, {"Queue"}),
+    (
+        {"Fn::Sub": ["${Name}-${Bucket}", {"Name": {"Ref": "Topic"}}]},
+        {"Bucket", "Topic"},
+    ),
+    (
+        {"Fn::Join": ["", [{"Ref": "A"}, {"Fn::If": ["Cond", {"Ref": "B"}, "c"]}]]},
+        {"A", "B"},
+    ),
+    ("plain string", set()),
+]
+
+
+@pytest.mark.parametrize("value, expected_references", find_references_tests)
+def test_find_references(value: Any, expected_references: Set[str]):
+    assert dependencies.find_references(value) == expected_references
+
+
+def test_build_graph():
+    resources = [
+        (
+            "Instance",
+            {
+                "Type": "AWS::EC2::Instance",
+                "DependsOn": "Gateway",
+                "Properties": {"SubnetId": {"Ref": "Subnet"}, "Name": {"Ref": "Param"}},
+            },
+        ),
+        (
+            "Subnet",
+            {"Type": "AWS::EC2::Subnet", "Properties": {"VpcId": {"Ref": "Vpc"}}},
+        ),
+        ("Gateway", {"Type": "AWS::EC2::InternetGateway", "DependsOn": ["Vpc"]}),
+        ("Vpc", {"Type": "AWS::EC2::VPC"}),
+    ]
+
+    graph = dependencies.build_graph(resources)
+
+    assert graph.dependencies == {
+        "Instance": {"Subnet", "Gateway"},
+        "Subnet": {"Vpc"},
+        "Gateway": {"Vpc"},
+        "Vpc": set(),
+    }
+    assert graph.dependents["Vpc"] == {"Subnet", "Gateway"}
+
+    assert graph.topological_order() == ["Vpc", "Subnet", "Gateway", "Instance"]
+    assert graph.closure(["Subnet"]) == {"Subnet", "Vpc"}
+    assert graph.closure(["Missing"]) == set()
+
+
+def test_topological_order_cycle():
+    graph = DependencyGraph({"A": {"B"}, "B": {"A"}, "C": set()})
+
+    assert graph.topological_order() == ["C", "A", "B"]
+
+
+def test_find_used():
+    conditions = {
+        "IsProd": {"Fn::Equals": [{"Ref": "Env"}, "prod"]},
+        "IsProdUsEast": {
+            "Fn::And": [
+                {"Condition": "IsProd"},
+                {"Fn::Equals": [{"Fn::FindInMap": ["Regions", "Main", "Name"]}, "a"]},
+            ]
+        },
+        "IsDev": {"Fn::Equals": [{"Ref": "Env"}, "dev"]},
+    }
+
+    values = [
+        {"Type": "AWS::S3::Bucket", "Condition": "IsProdUsEast"},
+        {"Value": {"Fn::If": ["IsProd", {"Fn::FindInMap": ["Amis", "a", "b"]}, "c"]}},
+    ]
+
+    used_maps, used_conditions = dependencies.find_used(values, conditions)
+
+    assert used_maps == {"Amis", "Regions"}
+    assert used_conditions == {"IsProd", "IsProdUsEast"}
+
+    # The mapping name is not known until conversion
+    dynamic = [{"Fn::FindInMap": [{"Ref": "MapName"}, "a", "b"]}]
+
+    assert dependencies.find_used(dynamic, conditions) == (None, set())
@@ -696,6 +696,12 @@ sub_s_tests = [
         no_exception(),
         hcl2.Resource("bar", "foo", {}, [], ["bazz"]),
     ),
+    (
+        "echo ${!HOME} ${foo}",
+        "echo ${HOME} ${var.foo}",
+        no_exception(),
+        hcl2.Variable("foo", {"value": "bar"}),
+    ),
 ]
 
 
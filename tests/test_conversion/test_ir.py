@@ -0,0 +1,118 @@
+import copy
+import pickle
+from typing import Any
+
+import pytest
+
+from cf2tf.conversion import ir
+from cf2tf.conversion.ir import FrozenDict, FrozenList
+
+
+def test_freeze():
+    value = {"Key": [{"Ref": "Bucket"}, "a", 1, True], "Other": None}
+
+    frozen = ir.freeze(value)
+
+    assert isinstance(frozen, FrozenDict)
+    assert isinstance(frozen["Key"], FrozenList)
+    assert isinstance(frozen["Key"][0], FrozenDict)
+    assert frozen == value
+    assert list(frozen) == ["Key", "Other"]
+    assert ir.freeze(frozen) is frozen
+
+
+def test_frozen_values_cant_change():
+    frozen = ir.freeze({"Key": ["a"]})
+
+    with pytest.raises(TypeError):
+        frozen["Key"] = "b"
+
+    with pytest.raises(TypeError):
+        frozen.update({"Other": "b"})
+
+    with pytest.raises(TypeError):
+        frozen["Key"].append("b")
+
+    with pytest.raises(TypeError):
+        frozen["Key"][0] = "b"
+
+
+def test_frozen_values_are_hashable():
+    node_ids: ir.NodeIds = {}
+
+    first = ir.freeze({"Key": ["a", 1]}, {}, node_ids)
+    second = ir.freeze({"Key": ["a", 1]}, {}, node_ids)
+
+    assert first is not second
+    assert hash(first) == hash(second)
+    assert first.key == second.key
+    assert first.node_id == second.node_id
+    assert len({first, second}) == 1
+
+    # Equal in python, but not the same Cloudformation value
+    assert ir.freeze([True], {}, node_ids).key != ir.freeze([1], {}, node_ids).key
+
+
+def test_frozen_hash_matches_equality():
+    assert ir.freeze({"a": True}) == ir.freeze({"a": 1})
+    assert hash(ir.freeze({"a": True})) == hash(ir.freeze({"a": 1}))
+
+    assert ir.freeze([True, {"b": 1.0}]) == ir.freeze([1, {"b": 1}])
+    assert hash(ir.freeze([True, {"b": 1.0}])) == hash(ir.freeze([1, {"b": 1}]))
+
+    # Maps are equal in any order
+    assert hash(ir.freeze({"a": 1, "b": 2})) == hash(ir.freeze({"b": 2, "a": 1}))
+
+
+def test_freeze_node_ids():
+    node_ids: ir.NodeIds = {}
+
+    frozen = ir.freeze({"Key": ["a"], "Other": ["a"]}, {}, node_ids)
+
+    assert len(node_ids) == 2
+    assert frozen.node_id == node_ids[frozen.key]
+    assert frozen["Key"] is frozen["Other"]
+
+
+def test_frozen_values_copy_and_pickle():
+    frozen = ir.freeze({"Key": ["a", {"b": 1}]})
+
+    assert copy.deepcopy(frozen) is frozen
+
+    loaded = pickle.loads(pickle.dumps(frozen))
+
+    assert isinstance(loaded, FrozenDict)
+    assert isinstance(loaded["Key"], FrozenList)
+    assert loaded.key == frozen.key
+    assert loaded.node_id == frozen.node_id
+    assert loaded["Key"].node_id == frozen["Key"].node_id
+    assert hash(loaded) == hash(frozen)
+
+
+def test_freeze_deep():
+    value: Any = {"Key": "a"}
+
+    # Much deeper than the recursion limit
+    for _ in range(10000):
+        value = [value, {"Ref": "Bucket"}]
+
+    frozen = ir.freeze(value)
+
+    assert isinstance(frozen, FrozenList)
+    assert hash(frozen) == hash(ir.freeze(value))
+
+    for _ in range(10000):
+        assert isinstance(frozen[1], FrozenDict)
+        frozen = frozen[0]
+
+    assert frozen == {"Key": "a"}
+
+
+def test_freeze_shares_strings():
+    first = "".join(["Te", "am"])
+    second = "".join(["Te", "am"])
+
+    frozen = ir.freeze({"Tags": [{first: "a"}, {"b": second}]})
+
+    assert first is not second
+    assert next(iter(frozen["Tags"][0])) is frozen["Tags"][1]["b"]
@@ -0,0 +1,61 @@
+from typing import Tuple
+
+import pytest
+
+from cf2tf.conversion import substitution
+from cf2tf.conversion.substitution import (
+    ATTRIBUTE,
+    ESCAPED,
+    LITERAL,
+    VARIABLE,
+    Token,
+)
+
+parse_tests = [
+    # (source, expected_tokens)
+    ("", ()),
+    ("plain $text", (Token(LITERAL, "plain $text"),)),
+    (
+        "arn:${AWS::Partition}:s3:::${Bucket}",
+        (
+            Token(LITERAL, "arn:"),
+            Token(VARIABLE, "AWS::Partition"),
+            Token(LITERAL, ":s3:::"),
+            Token(VARIABLE, "Bucket"),
+        ),
+    ),
+    (
+        "${Queue.Arn}${Db.Endpoint.Address}",
+        (
+            Token(ATTRIBUTE, "Queue.Arn", "Queue", "Arn"),
+            Token(ATTRIBUTE, "Db.Endpoint.Address", "Db", "Endpoint.Address"),
+        ),
+    ),
+    (
+        "echo ${!HOME} $${!x}",
+        (
+            Token(LITERAL, "echo "),
+            Token(ESCAPED, "${"),
+            Token(LITERAL, "HOME} $"),
+            Token(ESCAPED, "${"),
+            Token(LITERAL, "x}"),
+        ),
+    ),
+    # Variables start with a word character and need a closing brace
+    ("${ a} ${-b} ${c", (Token(LITERAL, "${ a} ${-b} ${c"),)),
+    (
+        "${a ${!b}",
+        (Token(VARIABLE, "a ${!b"),),
+    ),
+]
+
+
+@pytest.mark.parametrize("source, expected_tokens", parse_tests)
+def test_parse(source: str, expected_tokens: Tuple[Token, ...]):
+    assert substitution.parse(source) == expected_tokens
+
+
+def test_parse_is_cached():
+    source = "".join(["${Bucket}", "-logs"])
+
+    assert substitution.parse(source) is substitution.parse("${Bucket}-logs")
@@ -1,10 +1,13 @@
+import copy
 from contextlib import nullcontext as no_exception
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 import pytest
 
 import cf2tf.convert as convert
+from cf2tf.conversion import expressions, ir
+from cf2tf.save import Directory
 from cf2tf.terraform import code, doc_file
 from cf2tf.terraform.blocks import Block, Data, Locals, Output
 from cf2tf.terraform.hcl2.primitive import StringType
@@ -139,6 +142,30 @@ def test_get_block_by_type():
     assert block is None
 
 
+def test_block_registry():
+    locals_a = Locals({})
+    locals_b = Locals({})
+    data = Data("test", "test")
+
+    registry = convert.BlockRegistry([locals_a])
+
+    assert registry.add(data)
+    assert not registry.add(Data("test", "test"))
+
+    registry.append(locals_b)
+
+    assert list(registry) == [data, locals_a, locals_b]
+    assert locals_b in registry
+    assert Locals({}) not in registry
+
+    assert registry.get("data.test.test") is data
+    assert registry.get("locals.") is locals_a
+    assert registry.first(Locals) is locals_a
+    assert registry.first(Block) is data
+    assert registry.first(Output) is None
+    assert registry.of_type(Locals) == [locals_a, locals_b]
+
+
 def test_perform_resource_overrides():
     template = tc()
 
@@ -245,3 +272,244 @@ def test_parse_subection(
     with expectation:
         result = convert.parse_subsection(tf_arg_name, cf_props, docs_path)  # type: ignore
         assert isinstance(result[1], expected_type)
+
+
+def test_resource_plan():
+    template = tc()
+
+    resources = [
+        (
+            "BucketA",
+            {"Type": "AWS::S3::Bucket", "Properties": {"BucketName": "a"}},
+        ),
+        (
+            "BucketB",
+            {"Type": "AWS::S3::Bucket", "Properties": {"BucketName": "b"}},
+        ),
+    ]
+
+    bucket_a, bucket_b = template.convert_resources(resources)
+
+    assert list(template.plans) == ["AWS::S3::Bucket"]
+
+    plan = template.plans["AWS::S3::Bucket"]
+
+    assert plan.tf_type == "aws_s3_bucket"
+    assert len(plan.matches) == 1
+    assert template.resource_plan("AWS::S3::Bucket") is plan
+
+    assert bucket_a.arguments == {"bucket": "a"}
+    assert bucket_b.arguments == {"bucket": "b"}
+
+
+def test_convert_prop_to_arg_exact_match():
+    valid_arguments = ["vpc_id", "vpc_ids", "name"]
+    search_items = [item.replace("_", " ") for item in valid_arguments]
+
+    docs_path = Path("/tmp/terraform_src/website/docs/r/subnet.html.markdown")
+
+    result = convert.convert_prop_to_arg(
+        "VpcId", StringType("vpc"), search_items, docs_path
+    )
+
+    assert result == ("vpc_id", "vpc")
+
+
+def test_lookup_symbol():
+    cf_template = {
+        "Parameters": {"BucketName": {"Type": "String"}},
+        "Resources": {"MyBucket": {"Type": "AWS::S3::Bucket"}},
+    }
+
+    template = convert.TemplateConverter("test", cf_template, code.search_manager())
+    template.parse_template()
+
+    symbol = template.lookup_symbol("BucketName", ["Parameters", "Resources"])
+
+    assert symbol is not None
+    assert symbol.section == "Parameters"
+    assert symbol.tf_name == "bucket_name"
+    assert symbol.plan is None
+
+    symbol = template.lookup_symbol("MyBucket", ["Parameters", "Resources"])
+
+    assert symbol is not None
+    assert symbol.section == "Resources"
+    assert symbol.tf_name == "my_bucket"
+    assert symbol.tf_type == "aws_s3_bucket"
+    assert symbol.plan is template.plans["AWS::S3::Bucket"]
+    assert template.resource_lookup("MyBucket", ["Resources"]) is symbol.definition
+
+    assert template.lookup_symbol("MyBucket", ["Parameters"]) is None
+
+    # Replacing a section of the manifest rebuilds the symbol table
+    template.manifest["Resources"] = []
+
+    assert template.lookup_symbol("MyBucket", ["Resources"]) is None
+
+
+def test_cached_reference():
+    cf_template = {
+        "Resources": {"MyBucket": {"Type": "AWS::S3::Bucket"}},
+    }
+
+    template = convert.TemplateConverter("test", cf_template, code.search_manager())
+    template.parse_template()
+
+    first = expressions.ref(template, "MyBucket")
+    attr = expressions.get_att(template, ["MyBucket", "Arn"])
+
+    assert template.reference_hits == 0
+    assert template.reference_misses == 2
+
+    assert expressions.ref(template, "MyBucket") is first
+    assert expressions.get_att(template, ["MyBucket", "Arn"]) == attr
+    assert template.reference_hits == 2
+
+    symbol = template.lookup_symbol("MyBucket", ["Resources"])
+
+    assert symbol is not None
+    assert symbol.references[None] is first
+
+    # A new symbol table starts without any cached references
+    template.manifest["Resources"] = [("MyBucket", {"Type": "AWS::SQS::Queue"})]
+
+    assert expressions.ref(template, "MyBucket") != first
+
+
+def test_parse_template_name_collisions(monkeypatch):
+    cf_template = {
+        "Resources": {
+            "MyBucket": {"Type": "AWS::S3::Bucket"},
+            "my_bucket": {"Type": "AWS::S3::Bucket"},
+            "Topic": {"Type": "AWS::SNS::Topic"},
+        },
+    }
+
+    warnings: List[str] = []
+    monkeypatch.setattr(convert.log, "warning", warnings.append)
+
+    template = convert.TemplateConverter("test", cf_template, code.search_manager())
+    template.parse_template()
+
+    assert warnings == [
+        "The Resources ['MyBucket', 'my_bucket'] all convert to the Terraform name my_bucket."
+    ]
+
+
+def test_remove_unused():
+    cf_template = {
+        "Mappings": {
+            "Used": {"a": {"b": "c"}},
+            "Unused": {"a": {"b": "c"}},
+        },
+        "Conditions": {
+            "Dead": {"Fn::Equals": ["a", "b"]},
+        },
+        "Resources": {
+            "Topic": {
+                "Type": "AWS::SNS::Topic",
+                "Properties": {"TopicName": {"Fn::FindInMap": ["Used", "a", "b"]}},
+            },
+        },
+    }
+
+    template = convert.TemplateConverter("test", cf_template, code.search_manager())
+    template.parse_template()
+    template.remove_unused()
+
+    assert [name for name, _ in template.manifest["Mappings"]] == ["Used"]
+    assert "Conditions" not in template.manifest
+    assert template.lookup_symbol("Unused", ["Mappings"]) is None
+
+
+def test_resolve_values_frozen_elsewhere():
+    template = convert.TemplateConverter(
+        "test",
+        {"Resources": {"Topic": {"Type": "AWS::SNS::Topic"}}},
+        code.search_manager(),
+    )
+    template.parse_template()
+
+    # Frozen with tables of their own, so their node_ids are the same
+    first = ir.freeze({"A": {"Fn::Join": ["-", ["a", "b"]]}})
+    second = ir.freeze({"B": {"Fn::Join": [",", ["x", "y"]]}})
+
+    assert first["A"].node_id == second["B"].node_id
+
+    for _ in range(2):
+        first_result = template.resolve_values(first, expressions.ALL_FUNCTIONS)
+        second_result = template.resolve_values(second, expressions.ALL_FUNCTIONS)
+
+        assert first_result["A"] == 'join("-", ["a", "b"])'
+        assert second_result["B"] == 'join(",", ["x", "y"])'
+
+
+def test_convert_twice():
+    cf_template = {
+        "Resources": {
+            "Topic": {
+                "Type": "AWS::SNS::Topic",
+                "Properties": {"TopicName": {"Fn::Sub": "${AWS::StackName}-topic"}},
+            },
+        },
+    }
+
+    original = copy.deepcopy(cf_template)
+
+    def render():
+        template = convert.TemplateConverter("test", cf_template, code.search_manager())
+        return [str(block) for block in template.convert().resources]
+
+    assert render() == render()
+    assert cf_template == original
+
+
+def deep_join(depth: int) -> Any:
+    value: Any = "leaf"
+
+    for _ in range(depth):
+        value = {"Fn::Join": ["", ["a", value]]}
+
+    return value
+
+
+def deep_list(depth: int) -> Any:
+    value: Any = ["leaf"]
+
+    for _ in range(depth):
+        value = [value]
+
+    return value
+
+
+def deep_map(depth: int) -> Any:
+    value: Any = {"Leaf": "leaf"}
+
+    for _ in range(depth):
+        value = {"Inner": value}
+
+    return value
+
+
+@pytest.mark.parametrize(
+    "value, depth",
+    [(deep_join(1500), 1500), (deep_list(3000), 3000), (deep_map(3000), 3000)],
+    ids=["join", "list", "map"],
+)
+def test_convert_deep_template(value: Any, depth: int, tmp_path: Path):
+    cf_template = {
+        "Resources": {
+            "Bucket": {"Type": "AWS::S3::Bucket", "Properties": {"BucketName": value}}
+        },
+    }
+
+    template = convert.TemplateConverter("test", cf_template, code.search_manager())
+    config = template.convert()
+
+    Directory(str(tmp_path)).save(config.resources)
+
+    written = (tmp_path / "resource.tf").read_text()
+
+    assert "bucket = " in written
+    assert written.count("[") + written.count("{") >= depth
@@ -0,0 +1,59 @@
+import copy
+import pickle
+
+from cf2tf import interning
+from cf2tf.terraform.hcl2.custom import LiteralType
+from cf2tf.terraform.hcl2.primitive import StringType
+
+
+def test_intern_string():
+    first = "".join(["Na", "me"])
+    second = "".join(["Na", "me"])
+
+    assert first is not second
+    assert interning.intern_string(first) is interning.intern_string(second)
+
+    # Long strings and other types are not shared
+    script = "echo hello\n" * 100
+    assert interning.intern_string(script) is script
+    assert interning.intern_string(1) == 1
+
+    value = StringType("Name")
+    assert interning.intern_string(value) is value
+
+
+def test_intern_string_max_entries(monkeypatch):
+    monkeypatch.setattr(interning, "_strings", {})
+    monkeypatch.setattr(interning, "MAX_ENTRIES", 1)
+
+    first = interning.intern_string("".join(["a", "b"]))
+
+    assert interning.intern_string("".join(["a", "b"])) is first
+
+    other = "".join(["c", "d"])
+
+    assert interning.intern_string(other) is other
+    assert len(interning._strings) == 1
+
+
+def test_shared_terraform_strings():
+    value = StringType("".join(["Na", "me"]))
+
+    assert value is StringType("".join(["Na", "me"]))
+    assert value.value == "Name"
+    assert value.render() == '"Name"'
+
+    # The types are shared separately
+    literal = LiteralType("Name")
+
+    assert literal is not value
+    assert literal is LiteralType("Name")
+    assert literal.render() == "Name"
+
+    assert copy.copy(value) is value
+    assert copy.deepcopy(literal) is literal
+
+    unpickled = pickle.loads(pickle.dumps(value))
+
+    assert unpickled is value
+    assert unpickled.value == "Name"
@@ -0,0 +1,32 @@
+import pytest
+
+from cf2tf import naming
+
+pascal_to_snake_tests = [
+    # (input, expected)
+    ("MyBucket", "my_bucket"),
+    ("VPCGatewayAttachment", "vpc_gateway_attachment"),
+    ("Subnet2Az", "subnet2_az"),
+    ("lowercase", "lowercase"),
+]
+
+
+@pytest.mark.parametrize("input, expected", pascal_to_snake_tests)
+def test_pascal_to_snake(input: str, expected: str):
+    assert naming.pascal_to_snake(input) == expected
+
+
+def test_names_are_cached():
+    first = naming.pascal_to_snake("".join(["Log", "Bucket"]))
+
+    assert naming.pascal_to_snake("LogBucket") is first
+    assert naming.pascal_to_snake.cache_info().maxsize == naming.CACHE_SIZE
+
+
+def test_find_collisions():
+    logical_ids = ["MyBucket", "Topic", "MYBucket", "my_bucket", "Queue"]
+
+    assert naming.find_collisions(logical_ids) == {
+        "my_bucket": ["MyBucket", "MYBucket", "my_bucket"]
+    }
+    assert naming.find_collisions(["MyBucket", "Topic"]) == {}
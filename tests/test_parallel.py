@@ -0,0 +1,139 @@
+import copy
+import sys
+import threading
+from typing import List, Set
+
+import pytest
+
+import cf2tf.convert as convert
+from cf2tf import parallel
+from cf2tf.terraform import code
+from cf2tf.terraform.blocks import Data, Locals
+from cf2tf.terraform.hcl2.primitive import StringType
+
+make_shards_tests = [
+    # (total, count, expected_shards)
+    (10, 4, [(0, 3), (3, 6), (6, 9), (9, 10)]),
+    (3, 8, [(0, 1), (1, 2), (2, 3)]),
+    (4, 2, [(0, 2), (2, 4)]),
+    (0, 4, []),
+]
+
+
+@pytest.mark.parametrize("total, count, expected_shards", make_shards_tests)
+def test_make_shards(total: int, count: int, expected_shards: List):
+    assert parallel.make_shards(total, count) == expected_shards
+
+
+def test_block_changes():
+    locals_block = Locals({"mappings": StringType("a"), "other": StringType("b")})
+    blocks = convert.BlockRegistry([locals_block])
+
+    before = {id(block): dict(block.arguments) for block in blocks}
+
+    region = Data("current", "aws_region")
+    account = Data("current", "aws_caller_identity")
+    blocks.add(region)
+    blocks.add(account)
+    locals_block.arguments["stack_name"] = StringType("test")
+
+    # Arguments are compared by value, not by identity
+    locals_block.arguments["mappings"] = StringType("a")
+    locals_block.arguments["other"] = StringType("c")
+
+    changes = parallel.block_changes(blocks, before)
+
+    assert changes == (
+        [region, account],
+        [("locals.", {"other": StringType("c"), "stack_name": StringType("test")})],
+    )
+
+    # Replaying the changes on another copy gives the same blocks in the same order
+    other_locals = Locals({"mappings": StringType("a"), "other": StringType("b")})
+    other = convert.BlockRegistry([other_locals])
+    other.add(Data("current", "aws_region"))
+
+    parallel.apply_block_changes(other, changes)
+
+    assert [block.base_ref() for block in other] == [
+        block.base_ref() for block in blocks
+    ]
+    assert other_locals.arguments == locals_block.arguments
+
+
+bucket_template = {
+    "Resources": {
+        f"Bucket{i}": {
+            "Type": "AWS::S3::Bucket",
+            "Properties": {
+                "BucketName": {"Fn::Sub": "${AWS::Region}-${AWS::StackName}"}
+            },
+        }
+        for i in range(5)
+    },
+}
+
+
+def render(jobs: int, threads=False):
+    template = convert.TemplateConverter(
+        "test", copy.deepcopy(bucket_template), code.search_manager(), jobs, threads
+    )
+
+    return [str(block) for block in template.convert().resources]
+
+
+def test_convert_resources_parallel():
+    assert render(2) == render(1)
+
+
+def test_convert_resources_threaded(monkeypatch):
+    serial = render(1)
+
+    # Threads only run in parallel on free-threaded builds, but they work on any build
+    monkeypatch.setattr(parallel, "free_threaded", lambda: True)
+
+    assert render(3, threads=True) == serial
+
+
+def test_convert_resources_thread_pool(monkeypatch):
+    serial = render(1)
+
+    # Like a free-threaded build, so the real check and thread pool are used
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: False, raising=False)
+
+    convert_resource = convert.TemplateConverter.convert_resource
+    started = threading.Barrier(3, timeout=10)
+    threads: Set[int] = set()
+    lock = threading.Lock()
+
+    def convert_in_thread(self, resource_id, resource_values):
+        with lock:
+            first = len(threads) < 3 and threading.get_ident() not in threads
+            threads.add(threading.get_ident())
+
+        # The first resource of each thread waits until all three are converting
+        if first:
+            started.wait()
+
+        return convert_resource(self, resource_id, resource_values)
+
+    monkeypatch.setattr(
+        convert.TemplateConverter, "convert_resource", convert_in_thread
+    )
+
+    assert render(3, threads=True) == serial
+    assert len(threads) == 3
+
+
+def test_use_post_blocks():
+    template = convert.TemplateConverter("test", {}, code.search_manager())
+
+    blocks = convert.BlockRegistry()
+
+    with template.use_post_blocks(blocks):
+        template.add_post_block(Locals({}))
+
+        assert template.post_proccess_blocks is blocks
+
+    assert len(blocks) == 1
+    assert len(template.post_proccess_blocks) == 0
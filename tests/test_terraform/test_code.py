@@ -1,9 +1,12 @@
+import threading
 from pathlib import Path
 
 import pytest
 
 from cf2tf.terraform.code import (
     SearchManager,
+    doc_service,
+    name_service,
     resource_type_to_name,
     search_manager,
     transform_file_name,
@@ -63,3 +66,95 @@ def test_resource_type_to_name(input, expected):
     result = resource_type_to_name(input)
 
     assert result == expected
+
+
+def test_sm_find_cache(mock_sm: SearchManager):
+    first = mock_sm.find("AWS::ApiGatewayV2::Integration")
+
+    assert mock_sm.misses == 1
+    assert mock_sm.hits == 0
+
+    second = mock_sm.find("AWS::ApiGatewayV2::Integration")
+
+    assert first is second
+    assert first.name == "apigatewayv2_integration.markdown"
+    assert mock_sm.misses == 1
+    assert mock_sm.hits == 1
+
+
+def test_sm_find_searches_without_lock(mock_sm: SearchManager, monkeypatch):
+    cached = mock_sm.find("AWS::ApiGatewayV2::Integration")
+
+    search = mock_sm.index.extract_one
+    found = []
+
+    def extract_one(search_term: str):
+        # Another thread can use the cache while this one searches
+        other = threading.Thread(
+            target=lambda: found.append(mock_sm.find("AWS::ApiGatewayV2::Integration"))
+        )
+        other.start()
+        other.join(timeout=5)
+
+        return search(search_term)
+
+    monkeypatch.setattr(mock_sm.index, "extract_one", extract_one)
+
+    result = mock_sm.find("AWS::ApiGateway::Integration")
+
+    assert found == [cached]
+    assert result.name == "api_gateway_integration.markdown"
+    assert mock_sm.find("AWS::ApiGateway::Integration") is result
+
+
+def test_sm_find_all(mock_sm: SearchManager):
+    resource_types = [
+        "AWS::ApiGatewayV2::Integration",
+        "AWS::ApiGateway::Integration",
+        "AWS::ApiGatewayV2::Integration",
+    ]
+
+    results = mock_sm.find_all(resource_types)
+
+    assert list(results) == resource_types[:2]
+    assert results["AWS::ApiGatewayV2::Integration"].name == (
+        "apigatewayv2_integration.markdown"
+    )
+    assert results["AWS::ApiGateway::Integration"].name == (
+        "api_gateway_integration.markdown"
+    )
+    assert mock_sm.misses == 2
+
+    for resource_type, doc_path in results.items():
+        assert mock_sm.find(resource_type) == doc_path
+
+
+def test_sm_partitions(mock_sm: SearchManager):
+    assert set(mock_sm.partitions) == {"api", "apigatewayv2"}
+
+    result = mock_sm.find("AWS::ApiGatewayV2::Integration")
+
+    assert result.name == "apigatewayv2_integration.markdown"
+
+    # No docs start with apigateway, so all the docs are searched
+    result = mock_sm.find("AWS::ApiGateway::Integration")
+
+    assert result.name == "api_gateway_integration.markdown"
+
+    # The apigatewayv2 docs have no confident match, so all the docs are searched
+    result = mock_sm.find("AWS::ApiGatewayV2::Stage")
+
+    best = mock_sm.index.extract_one("apigatewayv2 stage")
+
+    assert best is not None
+    assert result == best[2]
+
+
+def test_doc_service():
+    assert doc_service("rds_cluster.html.markdown") == "rds"
+    assert doc_service("apigatewayv2_integration.markdown") == "apigatewayv2"
+    assert doc_service("subnet.html.markdown") == "subnet"
+
+
+def test_name_service():
+    assert name_service(resource_type_to_name("AWS::RDS::DBCluster")) == "rds"
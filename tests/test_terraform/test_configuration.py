@@ -1,7 +1,11 @@
+from typing import Any
+
 import pytest
 
+from cf2tf.conversion import expressions, ir
 from cf2tf.convert import TemplateConverter
 from cf2tf.terraform import code
+from cf2tf.terraform.hcl2.complex import ListType
 from cf2tf.terraform.hcl2.primitive import (
     BooleanType,
     NumberType,
@@ -50,3 +54,39 @@ def test_resolve_types(input, expected_result, rendered_value, tc: TemplateConve
 
     assert isinstance(result, expected_result)
     assert result.render() == rendered_value
+
+
+def test_resolve_values_deep():
+    template = tc()
+
+    # Much deeper than the recursion limit
+    nested: Any = "end"
+
+    for _ in range(5000):
+        nested = [nested]
+
+    result = template.resolve_values(ir.freeze(nested), {})
+
+    for _ in range(5000):
+        assert isinstance(result, ListType)
+        result = result[0]
+
+    assert result == StringType("end")
+
+    joined: Any = "end"
+
+    for _ in range(1500):
+        joined = {"Fn::Join": ["-", ["a", joined]]}
+
+    result = template.resolve_values(joined, expressions.ALL_FUNCTIONS)
+
+    assert result.render().startswith('join("-", ["a", join("-", ["a", ')
+
+
+def test_resolve_values_not_allowed():
+    template = tc()
+
+    with pytest.raises(ValueError, match="Fn::Equals not allowed to be nested"):
+        template.resolve_values(
+            {"Fn::Sub": {"Fn::Equals": ["a", "b"]}}, expressions.ALL_FUNCTIONS
+        )
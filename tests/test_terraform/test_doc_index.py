@@ -0,0 +1,188 @@
+from pathlib import Path
+
+import pytest
+
+from cf2tf.terraform import doc_file, doc_index
+from cf2tf.terraform.doc_index import DocIndex, IndexedDoc
+
+example_doc = """---
+subcategory: "VPC (Virtual Private Cloud)"
+---
+
+# Resource: aws_security_group
+
+## Example Usage
+
+```terraform
+# A comment inside of a code block
+resource "aws_security_group" "example" {}
+```
+
+## Argument Reference
+
+The following arguments are supported:
+
+* `name` - (Optional) Name of the security group.
+* `ingress` - (Optional) Configuration block for ingress rules.
+  This is a multiline description.
+* `vpc_id` - (Optional) VPC ID.
+
+### ingress
+
+* `from_port` - (Required) Start port.
+* `to_port` - (Required) End range port.
+
+## Attribute Reference
+
+This resource exports the following attributes:
+
+* `arn` - ARN of the security group.
+* `id` - ID of the security group.
+
+## Import
+"""
+
+
+@pytest.fixture()
+def docs_path(tmp_path: Path):
+    resources = tmp_path / "r"
+    resources.mkdir()
+    resources.joinpath("security_group.html.markdown").write_text(example_doc)
+    resources.joinpath("empty.html.markdown").write_text("# Resource: aws_empty\n")
+
+    return tmp_path
+
+
+@pytest.fixture()
+def index(docs_path: Path):
+    yield DocIndex.build(docs_path, "abc123")
+
+    doc_file.use_index(None)
+
+
+def test_indexed_doc_matches_doc_file(docs_path: Path):
+    doc_path = docs_path / "r" / "security_group.html.markdown"
+
+    indexed_doc = IndexedDoc.from_file(doc_path)
+
+    assert indexed_doc.parse_attributes(doc_path) == doc_file.parse_attributes(doc_path)
+    assert indexed_doc.all_sections() == doc_file.all_sections(doc_path)
+
+    for section in doc_file.all_sections(doc_path):
+        assert indexed_doc.read_section(doc_path, section) == doc_file.read_section(
+            doc_path, section
+        )
+
+
+def test_indexed_doc_missing_sections(docs_path: Path):
+    doc_path = docs_path / "r" / "empty.html.markdown"
+
+    indexed_doc = IndexedDoc.from_file(doc_path)
+
+    with pytest.raises(Exception, match="Unable to find arguments"):
+        indexed_doc.parse_attributes(doc_path)
+
+    with pytest.raises(Exception, match="Unable to find section"):
+        indexed_doc.read_section(doc_path, "### ingress")
+
+
+def test_index_save_and_load(index: DocIndex, docs_path: Path, tmp_path: Path):
+    index_path = tmp_path / "doc.index"
+
+    index.save(index_path)
+
+    loaded = DocIndex.load(index_path, docs_path)
+
+    assert loaded.commit == "abc123"
+    assert loaded.docs.keys() == index.docs.keys()
+
+    doc_path = docs_path / "r" / "security_group.html.markdown"
+
+    loaded_doc = loaded.get(doc_path)
+    indexed_doc = index.get(str(doc_path))
+
+    assert loaded_doc is not None
+    assert indexed_doc is not None
+    assert loaded_doc.to_dict() == indexed_doc.to_dict()
+
+
+def test_load_index(docs_path: Path, tmp_path: Path, monkeypatch):
+    index_path = tmp_path / "cached.index"
+    monkeypatch.setattr(doc_index, "index_path", lambda _: index_path)
+
+    built = doc_index.load_index(docs_path, "abc123")
+
+    assert index_path.exists()
+
+    def fail_build(*args):
+        raise AssertionError("The index should have been loaded from disk.")
+
+    monkeypatch.setattr(DocIndex, "build", fail_build)
+
+    loaded = doc_index.load_index(docs_path, "abc123")
+
+    assert loaded.docs.keys() == built.docs.keys()
+
+
+def test_doc_file_uses_index(index: DocIndex, docs_path: Path):
+    doc_path = docs_path / "r" / "security_group.html.markdown"
+
+    doc_file.use_index(index)
+
+    # Remove the file to prove the index is used
+    doc_path.unlink()
+
+    arguments, attributes = doc_file.parse_attributes(doc_path)
+
+    assert arguments == ["name", "ingress", "vpc_id"]
+    assert attributes == ["arn", "id"]
+    assert "### ingress" in doc_file.all_sections(doc_path)
+    assert doc_file.read_section(doc_path, "### ingress") == ["from_port", "to_port"]
+
+
+def test_index_load_is_lazy(index: DocIndex, docs_path: Path, tmp_path: Path):
+    index_path = tmp_path / "doc.index"
+
+    index.save(index_path)
+
+    loaded = DocIndex.load(index_path, docs_path)
+
+    assert isinstance(loaded.docs, doc_index.MappedDocs)
+    assert len(loaded.docs) == 2
+    assert not loaded.docs._decoded
+
+    doc_path = docs_path / "r" / "security_group.html.markdown"
+    doc = loaded.get(doc_path)
+
+    assert doc is not None
+    assert doc.arguments == ["name", "ingress", "vpc_id"]
+    assert list(loaded.docs._decoded) == ["r/security_group.html.markdown"]
+    assert loaded.get(doc_path) is doc
+    assert loaded.get(docs_path / "r" / "missing.html.markdown") is None
+
+
+def test_load_index_bad_file(docs_path: Path, tmp_path: Path, monkeypatch):
+    index_path = tmp_path / "cached.index"
+    index_path.write_bytes(b"")
+    monkeypatch.setattr(doc_index, "index_path", lambda _: index_path)
+
+    index = doc_index.load_index(docs_path, "abc123")
+
+    assert len(index.docs) == 2
+    assert index_path.stat().st_size > 0
+
+
+def test_load_index_reload_fails(docs_path: Path, tmp_path: Path, monkeypatch):
+    index_path = tmp_path / "cached.index"
+    monkeypatch.setattr(doc_index, "index_path", lambda _: index_path)
+
+    def fail_load(*args):
+        raise ValueError("Another process is writing the index.")
+
+    monkeypatch.setattr(DocIndex, "load", fail_load)
+
+    # The index that was just built is used as it is
+    index = doc_index.load_index(docs_path, "abc123")
+
+    assert len(index.docs) == 2
+    assert index_path.exists()
@@ -36,6 +36,15 @@ def test_list_render():
     assert triple_list == json.dumps([[example_value, b, c], b, c], indent=2)
 
 
+def test_list_render_repeated_item():
+    a = StringType("a")
+    b = StringType("b")
+
+    example_value = [a, b, a]
+
+    assert ListType(example_value).render() == json.dumps(example_value, indent=2)
+
+
 def test_map_render():
     a = StringType("a")
     b = StringType("b")
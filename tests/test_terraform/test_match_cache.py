@@ -0,0 +1,166 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import cf2tf.convert as convert
+from cf2tf.terraform import match_cache
+from cf2tf.terraform.match_cache import MatchCache, items_digest
+
+
+@pytest.fixture()
+def cache_path(tmp_path: Path):
+    return tmp_path / "matches.sqlite3"
+
+
+def test_get_and_put(cache_path: Path):
+    cache = MatchCache(cache_path, "abc123")
+
+    digest = items_digest(["bucket", "acl"])
+
+    assert cache.get("Bucket Name", digest, 80) == (False, None)
+
+    cache.put("Bucket Name", digest, 80, ("bucket", 90))
+    cache.put("Nothing", digest, 80, None)
+
+    assert cache.get("Bucket Name", digest, 80) == (True, ("bucket", 90))
+    cache.close()
+
+    # A new cache has to read the matches from disk
+    cache = MatchCache(cache_path, "abc123")
+
+    assert cache.get("Bucket Name", digest, 80) == (True, ("bucket", 90))
+    assert cache.get("Nothing", digest, 80) == (True, None)
+    assert cache.get("Bucket Name", digest, 95) == (False, None)
+    assert cache.hits == 2
+    assert cache.misses == 1
+
+    # Matches are saved per commit
+    other_cache = MatchCache(cache_path, "def456")
+
+    assert other_cache.get("Bucket Name", digest, 80) == (False, None)
+
+
+def test_version(cache_path: Path, monkeypatch):
+    cache = MatchCache(cache_path, "abc123")
+    cache.put("a", "digest", 0, ("a", 100))
+    cache.close()
+
+    assert MatchCache(cache_path, "abc123").get("a", "digest", 0) == (
+        True,
+        ("a", 100),
+    )
+
+    # The matches of another version of the matcher are dropped
+    monkeypatch.setattr(match_cache, "VERSION", match_cache.VERSION + 1)
+
+    cache = MatchCache(cache_path, "abc123")
+
+    assert cache.get("a", "digest", 0) == (False, None)
+
+    cache.put("b", "digest", 0, ("b", 100))
+    cache.close()
+
+    assert MatchCache(cache_path, "abc123").get("b", "digest", 0) == (
+        True,
+        ("b", 100),
+    )
+
+
+def test_trim(cache_path: Path):
+    cache = MatchCache(cache_path, "abc123", max_entries=2)
+
+    for term in ["a", "b", "c"]:
+        cache.put(term, "digest", 0, (term, 100))
+
+    cache.flush()
+
+    cache = MatchCache(cache_path, "abc123")
+
+    assert cache.get("a", "digest", 0) == (False, None)
+    assert cache.get("c", "digest", 0) == (True, ("c", 100))
+
+
+def test_prune(cache_path: Path, monkeypatch):
+    old_cache = MatchCache(cache_path, "old")
+    old_cache.put("a", "digest", 0, ("a", 100))
+    old_cache.close()
+
+    new_cache = MatchCache(cache_path, "new")
+    new_cache.put("a", "digest", 0, ("a", 100))
+    new_cache.close()
+
+    monkeypatch.setattr(match_cache, "cache_path", lambda: cache_path)
+
+    assert match_cache.prune_cache() == 1
+
+    assert MatchCache(cache_path, "old").get("a", "digest", 0) == (False, None)
+    assert MatchCache(cache_path, "new").get("a", "digest", 0) == (True, ("a", 100))
+
+
+def test_matcher_uses_cache(cache_path: Path):
+    cache = MatchCache(cache_path, "abc123")
+
+    search_items = ["bucket", "bucket prefix", "acl"]
+
+    match_cache.use_cache(cache)
+
+    try:
+        result = convert.matcher("Bucket Name", search_items, 80)
+
+        assert cache.get("Bucket Name", items_digest(search_items), 80) == (
+            True,
+            result,
+        )
+
+        # Cached matches are used even if the fuzzy match would be different
+        cache.put("Access Control", items_digest(search_items), 80, ("bucket", 95))
+
+        assert convert.matcher("Access Control", search_items, 80) == ("bucket", 95)
+
+        # Exact matches never need the cache
+        assert convert.matcher("Acl", search_items, 80) == ("acl", 100)
+        assert cache.get("Acl", items_digest(search_items), 80) == (False, None)
+    finally:
+        match_cache.use_cache(None)
+
+
+def test_prune_bad_file(cache_path: Path, monkeypatch):
+    cache_path.write_bytes(b"not a database" * 100)
+
+    monkeypatch.setattr(match_cache, "cache_path", lambda: cache_path)
+
+    assert match_cache.prune_cache() is None
+    assert match_cache.open_cache("abc123") is None
+
+
+def test_disabled_on_error(cache_path: Path):
+    cache = MatchCache(cache_path, "abc123")
+    cache.put("a", "digest", 0, ("a", 100))
+
+    # Like a file that was locked or made read only while converting
+    cache.connection.close()
+    cache.connection = sqlite3.connect(":memory:")
+    cache.connection.close()
+
+    cache.flush()
+
+    assert cache.disabled
+
+    # The matches of this run are still used, but nothing else is read or saved
+    assert cache.get("a", "digest", 0) == (True, ("a", 100))
+    assert cache.get("b", "digest", 0) == (False, None)
+
+    cache.put("b", "digest", 0, ("b", 100))
+    cache.close()
+
+    assert MatchCache(cache_path, "abc123").get("a", "digest", 0) == (False, None)
+
+    # A failed lookup disables the cache too
+    cache = MatchCache(cache_path, "abc123")
+    cache.connection.close()
+
+    assert cache.get("c", "digest", 0) == (False, None)
+    assert cache.disabled
+
+    cache.close()
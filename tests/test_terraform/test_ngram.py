@@ -0,0 +1,88 @@
+import pytest
+from thefuzz import fuzz, process  # type: ignore
+
+from cf2tf.terraform.ngram import NgramIndex, trigrams
+
+choices = [
+    "api gateway integration",
+    "apigateway v2 integration",
+    "cloudwatch event rule",
+    "lambda function",
+    "lambda function url",
+    "security group",
+    "security group rule",
+    "vpc security group ingress rule",
+]
+
+extract_one_tests = [
+    # (search_term, score_cutoff)
+    ("apigatewayv2 integration", 0),
+    ("events rule", 0),
+    ("lambda function", 0),
+    ("Security Group Ingress", 80),
+    ("nothing like the choices", 95),
+    ("", 0),
+]
+
+
+@pytest.mark.parametrize("scorer", [fuzz.ratio, fuzz.WRatio])
+@pytest.mark.parametrize("search_term, score_cutoff", extract_one_tests)
+def test_extract_one(search_term: str, score_cutoff: int, scorer):
+    index = NgramIndex(choices, scorer=scorer, shortlist_size=2)
+
+    expected = process.extractOne(
+        search_term, choices, scorer=scorer, score_cutoff=score_cutoff
+    )
+
+    assert index.extract_one(search_term, score_cutoff) == expected
+
+
+def test_extract_one_mapping():
+    mapped_choices = {f"{choice}.markdown": choice for choice in choices}
+
+    index = NgramIndex(mapped_choices, scorer=fuzz.ratio)
+
+    result = index.extract_one("s3 bucket")
+
+    assert result == process.extractOne("s3 bucket", mapped_choices, scorer=fuzz.ratio)
+    assert result[2] == f"{result[0]}.markdown"
+
+
+def test_shortlist():
+    index = NgramIndex(choices, shortlist_size=3)
+
+    shortlist = [choices[pos] for pos in index.shortlist("security group")]
+
+    assert shortlist[0] == "security group"
+    assert len(shortlist) == 3
+
+
+def test_unsupported_scorer():
+    with pytest.raises(ValueError):
+        NgramIndex(choices, scorer=fuzz.partial_ratio)
+
+
+def test_trigrams():
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+
+
+exact_match_tests = [
+    # (search_term, expected_result)
+    ("Security Group", ("security group", 100)),
+    ("security-group", ("security group", 100)),
+    ("Lambda Function", ("lambda function", 100)),
+    ("Lambda Functions", None),
+    ("", None),
+]
+
+
+@pytest.mark.parametrize("search_term, expected_result", exact_match_tests)
+def test_exact_match(search_term: str, expected_result):
+    index = NgramIndex(choices)
+
+    result = index.exact_match(search_term)
+
+    assert result == expected_result
+
+    if result:
+        assert result == process.extractOne(search_term, choices)